@@ -0,0 +1,37 @@
+import numpy as np
+from agent_index import AgentIndex
+from agent_store import SEARCH_COLUMNS, AgentStore
+from profiler import profiler
+
+
+class AgentFilter:
+    def __init__(self, df, search_columns=SEARCH_COLUMNS):
+        # Lower-cased search text is built once per data version instead of per
+        # keystroke; an AgentStore (say, the cached last-known one) is used as is
+        self.store = df if isinstance(df, AgentStore) else AgentStore(df, search_columns)
+        self._keys = self.store.search_keys
+        self.index = AgentIndex(self.store)
+        self._last = None
+
+    def apply(self, status="All", search_text="", account=None):
+        with profiler.span("filter") as span:
+            rows = self._rows(status, search_text, account)
+            span["rows"] = len(rows)
+        return self.store.take(rows)
+
+    def _rows(self, status, search_text, account):
+        search_text = search_text.casefold()
+        scope = (account, status)
+        last = self._last
+        if last is not None and last[0] == scope and search_text.startswith(last[1]):
+            if search_text == last[1]:
+                return last[2]
+            # Adding characters can only narrow the previous match
+            rows = last[2]
+        else:
+            rows = self.index.rows(account, status)
+
+        if search_text:
+            rows = rows[np.char.find(self._keys[rows], search_text) >= 0]
+        self._last = (scope, search_text, rows)
+        return rows
@@ -0,0 +1,69 @@
+import numpy as np
+
+
+def _codes(store, column):
+    coded = store.codes(column)
+    if coded is None:
+        return np.zeros(store.size, dtype=np.int8), [None]
+    codes, labels = coded
+    return codes, list(labels)
+
+
+class AgentIndex:
+    # Built from an AgentStore's category codes, so no strings are compared
+    def __init__(self, store):
+        self.size = store.size
+        self.account_codes, self.accounts = _codes(store, "Account")
+        self.status_codes, self.statuses = _codes(store, "Status")
+        self._has_account = store.codes("Account") is not None
+        self._has_status = store.codes("Status") is not None
+
+        # One stable sort by (account, status) makes every group a contiguous,
+        # order-preserving slice of self._order
+        width = len(self.statuses)
+        keys = self.account_codes.astype(np.int64) * width + self.status_codes
+        self._order = np.argsort(keys, kind="stable")
+        sorted_keys = keys[self._order]
+        bounds = np.flatnonzero(np.diff(sorted_keys)) + 1
+        starts = np.concatenate(([0], bounds)).astype(np.int64)
+        stops = np.concatenate((bounds, [self.size])).astype(np.int64)
+
+        self._groups = {}
+        self._account_slices = {}
+        if self.size:
+            for start, stop in zip(starts.tolist(), stops.tolist()):
+                account, status = divmod(int(sorted_keys[start]), width)
+                self._groups[account, status] = (start, stop)
+                first, _ = self._account_slices.get(account, (start, stop))
+                self._account_slices[account] = (first, stop)
+        self._account_lookup = {a: i for i, a in enumerate(self.accounts)}
+        self._status_lookup = {s: i for i, s in enumerate(self.statuses)}
+
+    def rows(self, account=None, status="All"):
+        use_account = account is not None and self._has_account
+        use_status = status != "All" and self._has_status
+        if not use_account and not use_status:
+            return np.arange(self.size)
+
+        accounts = range(len(self.accounts))
+        if use_account:
+            if account not in self._account_lookup:
+                return np.empty(0, dtype=np.int64)
+            accounts = [self._account_lookup[account]]
+
+        if not use_status:
+            slices = [self._account_slices[a] for a in accounts if a in self._account_slices]
+        else:
+            if status not in self._status_lookup:
+                return np.empty(0, dtype=np.int64)
+            code = self._status_lookup[status]
+            slices = [self._groups[a, code] for a in accounts if (a, code) in self._groups]
+
+        if not slices:
+            return np.empty(0, dtype=np.int64)
+        if len(slices) == 1:
+            start, stop = slices[0]
+            rows = self._order[start:stop]
+            # An account slice spans several status groups, each sorted on its own
+            return rows if use_status else np.sort(rows)
+        return np.sort(np.concatenate([self._order[start:stop] for start, stop in slices]))
@@ -0,0 +1,256 @@
+import os
+import sys
+import threading
+import time
+import numpy as np
+
+KEY_COLUMN = "Login ID"
+SEARCH_COLUMNS = ("Login ID", "Agent Name")
+CATEGORY_COLUMNS = ("Status", "Account")
+DURATION_COLUMN = "Duration (min)"
+# Optional hidden column of time.monotonic() status-change times, filled
+# in by sources that know when each change happened (see push_feed)
+SINCE_COLUMN = "_since"
+# Last agent table shown, so the next start can paint it before any data
+# (or pandas) has loaded
+LAST_KNOWN = os.path.join(".rtm_cache", "last_agents.npz")
+# The last-known file only matters to the next start, so it's rewritten at
+# most this often (seconds) rather than for every new agents version
+SAVE_INTERVAL = 60
+
+
+# Columns are read with np.asarray, so a store builds the same from a pandas
+# frame or a csv_reader.CsvTable and this module never imports pandas
+def _missing(values):
+    return np.asarray(np.equal(values, None) | (values != values), dtype=bool)
+
+
+def _categorical(values):
+    values = np.asarray(values, dtype=object)
+    missing = _missing(values)
+    # Sorted categories keep the codes stable from one file version to the
+    # next as long as the set of values is the same
+    labels, codes = np.unique(values[~missing].astype(str), return_inverse=True)
+    dtype = np.int8 if len(labels) < 127 else np.int32
+    # Missing values pick the trailing "" label
+    out = np.full(len(values), len(labels), dtype=dtype)
+    out[~missing] = codes
+    return out, np.array([str(c) for c in labels] + [""], dtype=object)
+
+
+def _floats(values):
+    values = np.asarray(values)
+    try:
+        return values.astype(np.float64)
+    except (TypeError, ValueError):
+        pass
+    out = np.full(len(values), np.nan)
+    for i, value in enumerate(values):
+        try:
+            out[i] = float(value)
+        except (TypeError, ValueError):
+            pass  # Non-numeric durations stay NaN
+    return out
+
+
+def _duration(values):
+    values = _floats(values)
+    finite = values[~np.isnan(values)]
+    if len(finite) == len(values) and np.all(finite == np.round(finite)) and (not len(finite) or np.abs(finite).max() < 2 ** 31):
+        return values.astype(np.int32)
+    return values.astype(np.float32)
+
+
+def _hash_text(values):
+    # FNV-1a over each string's code points; padding is skipped so the hash
+    # doesn't depend on the longest string in the array
+    chars = np.asarray(values, dtype=str)
+    width = chars.dtype.itemsize // 4
+    points = chars.view(np.uint32).reshape(len(chars), width) if width else np.zeros((len(chars), 0), dtype=np.uint32)
+    hashes = np.full(len(chars), 0xCBF29CE484222325, dtype=np.uint64)
+    prime = np.uint64(0x100000001B3)
+    for j in range(width):
+        point = points[:, j].astype(np.uint64)
+        hashes = np.where(point != 0, (hashes ^ point) * prime, hashes)
+    return hashes
+
+
+class AgentRows:
+    # A filtered view of an AgentStore; nothing is copied until a column is read
+    def __init__(self, store, rows):
+        self.store = store
+        self.rows = rows
+        self.headers = store.headers
+        self.live_column = store.live_column
+
+    def __len__(self):
+        return len(self.rows)
+
+    def column(self, i):
+        # (values, labels): labels is None for plain columns, otherwise the
+        # values are codes into labels
+        values, labels = self.store.columns[i]
+        return values[self.rows], labels
+
+    def since(self):
+        return None if self.store.since is None else self.store.since[self.rows]
+
+    def keys(self):
+        return None if self.store.keys is None else self.store.keys[self.rows]
+
+    def signatures(self):
+        return None if self.store.signatures is None else self.store.signatures[self.rows]
+
+
+class AgentStore:
+    # agent_status.csv in compact arrays: int8 category codes for Status and
+    # Account, one numeric array for durations, interned Login IDs and a
+    # case-folded search key per agent; `since` holds each agent's
+    # status-change time on the monotonic clock so durations can tick locally
+    def __init__(self, df, search_columns=SEARCH_COLUMNS):
+        self.size = len(df)
+        self.headers = [str(c) for c in df.columns if c != SINCE_COLUMN]
+        self.columns = []
+        self.since = None
+        self.live_column = None
+        self._codes = {}
+        for name in df.columns:
+            if name == SINCE_COLUMN:
+                continue
+            values = np.asarray(df[name])
+            if name in CATEGORY_COLUMNS:
+                codes, categories = _categorical(values)
+                self._codes[name] = (codes, categories)
+                self.columns.append((codes, categories))
+            elif name == DURATION_COLUMN:
+                durations = _duration(values)
+                self.live_column = len(self.columns)
+                self.columns.append((durations, None))
+                self.since = self._since(df, durations)
+            else:
+                values = np.where(_missing(values), "", values.astype(object))
+                self.columns.append((np.array([sys.intern(str(v)) for v in values], dtype=object), None))
+
+        columns = [self.headers.index(c) for c in search_columns if c in self.headers]
+        if columns:
+            keys = [str(v) for v in self.columns[columns[0]][0]]
+            for i in columns[1:]:
+                keys = [k + "\x00" + str(v) for k, v in zip(keys, self.columns[i][0])]
+            self.search_keys = np.array([k.casefold() for k in keys], dtype=str)
+        else:
+            self.search_keys = np.full(self.size, "", dtype=str)
+        self.keys, self.signatures = self._hashes()
+
+    def _hashes(self):
+        # uint64 hash of each Login ID, and of each whole row apart from the
+        # ticking duration, so refreshes can be diffed by key without
+        # comparing strings
+        if KEY_COLUMN not in self.headers:
+            return None, None
+        signatures = np.zeros(self.size, dtype=np.uint64)
+        for i, (values, labels) in enumerate(self.columns):
+            if labels is not None:
+                hashes = _hash_text(labels)[values]
+            else:
+                hashes = _hash_text(values)
+            if self.headers[i] == KEY_COLUMN:
+                keys = hashes
+            if i != self.live_column:
+                signatures = signatures * np.uint64(0x100000001B3) ^ hashes
+        return keys, signatures
+
+    def _since(self, df, durations):
+        # Durations are as of the export; CsvSource stamps the file's mtime
+        exported = df.attrs.get("mtime")
+        age = 0.0 if exported is None else max(0.0, time.time() - exported)
+        since = time.monotonic() - age - durations.astype(np.float64) * 60
+        if SINCE_COLUMN in df.columns:
+            known = _floats(df[SINCE_COLUMN])
+            since = np.where(np.isnan(known), since, known)
+        return since
+
+    def save(self, path=LAST_KNOWN):
+        # Text goes in as fixed-width strings so the file loads without
+        # pickle; since is stored as wall-clock time to survive a restart
+        arrays = {"headers": np.array(self.headers, dtype=str), "search_keys": self.search_keys}
+        if self.keys is not None:
+            arrays["keys"] = self.keys
+            arrays["signatures"] = self.signatures
+        for i, (values, labels) in enumerate(self.columns):
+            arrays[f"values_{i}"] = values.astype(str) if values.dtype == object else values
+            if labels is not None:
+                arrays[f"labels_{i}"] = labels.astype(str)
+        if self.since is not None:
+            arrays["since"] = self.since + (time.time() - time.monotonic())
+            arrays["live_column"] = np.array(self.live_column)
+        tmp = path + ".tmp.npz"
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            np.savez(tmp, **arrays)
+            os.replace(tmp, path)
+        except OSError:
+            return False
+        return True
+
+    @classmethod
+    def load(cls, path=LAST_KNOWN):
+        try:
+            data = np.load(path, allow_pickle=False)
+        except (OSError, ValueError):
+            return None
+        with data:
+            store = cls.__new__(cls)
+            store.headers = [str(h) for h in data["headers"]]
+            store.columns = []
+            store._codes = {}
+            for i, name in enumerate(store.headers):
+                values = data[f"values_{i}"]
+                labels = data[f"labels_{i}"].astype(object) if f"labels_{i}" in data else None
+                if values.dtype.kind == "U":
+                    values = values.astype(object)
+                store.columns.append((values, labels))
+                if labels is not None:
+                    store._codes[name] = (values, labels)
+            store.search_keys = data["search_keys"]
+            store.size = len(store.search_keys)
+            store.keys = data["keys"] if "keys" in data else None
+            store.signatures = data["signatures"] if "signatures" in data else None
+            store.since = None
+            store.live_column = None
+            if "since" in data:
+                store.since = data["since"] - (time.time() - time.monotonic())
+                store.live_column = int(data["live_column"])
+        return store
+
+    def codes(self, name):
+        # (codes, labels) for a category column, or None if the file lacks it
+        return self._codes.get(name)
+
+    def take(self, rows):
+        return AgentRows(self, rows)
+
+
+class LastKnownSaver:
+    # offer() runs on the loader thread with every new store and saves at
+    # most once per interval; flush() writes the newest one, e.g. on quit
+    def __init__(self, path=LAST_KNOWN, interval=SAVE_INTERVAL):
+        self.path = path
+        self.interval = interval
+        self._lock = threading.Lock()
+        self._store = None
+        self._saved = None
+        self._last = None
+
+    def offer(self, store):
+        self._store = store
+        if self._last is None or time.monotonic() - self._last >= self.interval:
+            self.flush()
+
+    def flush(self):
+        with self._lock:
+            store = self._store
+            if store is None or store is self._saved:
+                return
+            self._saved = store
+            self._last = time.monotonic()
+            store.save(self.path)
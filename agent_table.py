@@ -0,0 +1,354 @@
+import time
+import numpy as np
+from PyQt5.QtCore import QAbstractTableModel, QModelIndex, Qt, QTimer
+from PyQt5.QtGui import QBrush, QColor
+from PyQt5.QtWidgets import QHeaderView, QTableView
+from profiler import profiler
+from row_diff import diff_rows, runs
+
+NO_COLOR, YELLOW, RED = 0, 1, 2
+MINUTE_MS = 60000
+# Rows handed to the view at a time; more are fetched as it scrolls down
+FETCH_BATCH = 1000
+
+
+def _same(old, new):
+    old, old_labels = old
+    new, new_labels = new
+    if old_labels is not None or new_labels is not None:
+        if old_labels is None or new_labels is None:
+            return np.zeros(len(new), dtype=bool)
+        if len(old_labels) != len(new_labels) or (old_labels != new_labels).any():
+            # Different category sets; fall back to comparing the labels
+            old, new = old_labels[old], new_labels[new]
+    if old.dtype != new.dtype:
+        return np.zeros(len(new), dtype=bool)
+    equal = np.asarray(old == new, dtype=bool)
+    # NaN never equals itself, so treat "both missing" as unchanged
+    both_missing = np.asarray((old != old) & (new != new), dtype=bool)
+    return equal | both_missing
+
+
+def _numeric(values):
+    try:
+        return values.astype(float)
+    except (TypeError, ValueError):
+        pass
+    out = np.full(len(values), np.nan)
+    for i, value in enumerate(values):
+        try:
+            out[i] = float(value)
+        except (TypeError, ValueError):
+            pass  # Ignore non-numeric values
+    return out
+
+
+def _minutes(since, now):
+    minutes = np.floor((now - since) / 60)
+    if np.isnan(minutes).any():
+        return minutes
+    return minutes.astype(np.int32)
+
+
+class AgentTableModel(QAbstractTableModel):
+    _brushes = None
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        if AgentTableModel._brushes is None:
+            # Shared by every cell instead of a new colour per item
+            AgentTableModel._brushes = {YELLOW: QBrush(QColor(255, 255, 0)), RED: QBrush(QColor(255, 0, 0))}
+        self._headers = []
+        self._columns = []
+        self._rows = 0
+        self._fetched = 0
+        # Model row -> array row while _patchRows is between signals; None
+        # when the arrays match the model one to one
+        self._row_map = None
+        # Login ID and row hashes of what the view shows, for keyed diffs
+        self._keys = None
+        self._signatures = None
+        self._threshold_column = None
+        self._yellow = None
+        self._red = None
+        self._durations = None
+        self._level_cache = {}
+        self._levels = None
+        # Durations tick from each agent's status-change time instead of
+        # waiting for the next export
+        self._since = None
+        self._live = None
+        self._deadlines = None
+        self._next_deadline = 0
+        self._minute_timer = QTimer(self)
+        self._minute_timer.setInterval(MINUTE_MS)
+        self._minute_timer.timeout.connect(self._tickMinutes)
+        self._deadline_timer = QTimer(self)
+        self._deadline_timer.setSingleShot(True)
+        self._deadline_timer.timeout.connect(self._onDeadline)
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self._fetched
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and self._fetched < self._rows
+
+    def fetchMore(self, parent=QModelIndex()):
+        count = min(FETCH_BATCH, self._rows - self._fetched)
+        if parent.isValid() or count <= 0:
+            return
+        self.beginInsertRows(QModelIndex(), self._fetched, self._fetched + count - 1)
+        self._fetched += count
+        self.endInsertRows()
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._headers)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole:
+            return None
+        if orientation == Qt.Horizontal:
+            return self._headers[section] if section < len(self._headers) else None
+        return str(section + 1)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        row = index.row() if self._row_map is None else self._row_map[index.row()]
+        if role == Qt.DisplayRole:
+            values, labels = self._columns[index.column()]
+            value = values[row]
+            return str(value) if labels is None else labels[value]
+        if role == Qt.BackgroundRole and self._levels is not None and index.column() == self._thresholdIndex():
+            return self._brushes.get(self._levels[row])
+        return None
+
+    def setThresholds(self, column, yellow, red):
+        if column != self._threshold_column:
+            self._durations = None
+            self._level_cache = {}
+        self._threshold_column = column
+        self._yellow = yellow
+        self._red = red
+        old_levels = self._levels
+        self._levels = self._classify()
+        col = self._thresholdIndex()
+        if col is None or self._levels is None:
+            return
+        if old_levels is None or len(old_levels) != len(self._levels):
+            changed = np.arange(self._rows)
+        else:
+            changed = np.flatnonzero(old_levels != self._levels)
+        self._emitRows(changed, col, col, [Qt.BackgroundRole])
+
+    def _thresholdIndex(self):
+        if self._threshold_column in self._headers:
+            return self._headers.index(self._threshold_column)
+        return None
+
+    def _classify(self):
+        col = self._thresholdIndex()
+        if col is None or self._yellow is None:
+            return None
+        if col == self._live:
+            return self._liveLevels()
+        key = (self._yellow, self._red)
+        if key not in self._level_cache:
+            if self._durations is None:
+                values, labels = self._columns[col]
+                self._durations = _numeric(values if labels is None else labels[values])
+            d = self._durations
+            # NaN compares False, so non-numeric cells stay uncoloured
+            self._level_cache[key] = np.select([d >= self._red, d >= self._yellow], [RED, YELLOW], NO_COLOR).astype(np.int8)
+        return self._level_cache[key]
+
+    def _liveLevels(self):
+        d = (time.monotonic() - self._since) / 60
+        levels = np.select([d >= self._red, d >= self._yellow], [RED, YELLOW], NO_COLOR).astype(np.int8)
+        # Every future threshold crossing is known now, so the deadlines are
+        # sorted once and consumed from the front as they fall due
+        times, rows, marks = [], [], []
+        for limit, level in ((self._yellow, YELLOW), (self._red, RED)):
+            pending = np.flatnonzero(levels < level)
+            due = self._since[pending] + limit * 60
+            known = ~np.isnan(due)
+            times.append(due[known])
+            rows.append(pending[known])
+            marks.append(np.full(known.sum(), level, dtype=np.int8))
+        times = np.concatenate(times)
+        order = np.argsort(times, kind="stable")
+        self._deadlines = (times[order], np.concatenate(rows)[order], np.concatenate(marks)[order])
+        self._next_deadline = 0
+        self._armDeadline()
+        return levels
+
+    def _armDeadline(self):
+        times = self._deadlines[0]
+        if self._next_deadline >= len(times):
+            self._deadline_timer.stop()
+            return
+        wait = (times[self._next_deadline] - time.monotonic()) * 1000
+        self._deadline_timer.start(int(min(max(wait, 0) + 1, 2 ** 31 - 1)))
+
+    def _onDeadline(self):
+        if self._deadlines is None or self._levels is None:
+            return
+        times, rows, marks = self._deadlines
+        stop = int(np.searchsorted(times, time.monotonic(), side="right"))
+        due = rows[self._next_deadline:stop]
+        np.maximum.at(self._levels, due, marks[self._next_deadline:stop])
+        self._next_deadline = stop
+        self._emitRows(np.unique(due), self._live, self._live, [Qt.BackgroundRole])
+        self._armDeadline()
+
+    def _tickMinutes(self):
+        if self._since is None:
+            return
+        old = self._columns[self._live]
+        self._columns[self._live] = (_minutes(self._since, time.monotonic()), None)
+        changed = np.flatnonzero(~_same(old, self._columns[self._live]))
+        self._emitRows(changed, self._live, self._live, [Qt.DisplayRole])
+
+    def setRows(self, agents):
+        # agents is an AgentRows view; category columns arrive as codes
+        with profiler.span("model", rows=len(agents)):
+            self._setRows(agents)
+
+    def _setRows(self, agents):
+        headers = list(agents.headers)
+        columns = [agents.column(i) for i in range(len(headers))]
+        rows = len(agents)
+        since = agents.since()
+        live = agents.live_column if since is not None else None
+        if live is not None:
+            columns[live] = (_minutes(since, time.monotonic()), None)
+        self._since = since
+        self._live = live
+        if live is None:
+            self._minute_timer.stop()
+            self._deadline_timer.stop()
+            self._deadlines = None
+        elif not self._minute_timer.isActive():
+            self._minute_timer.start()
+
+        keys = agents.keys()
+        signatures = agents.signatures()
+        diff = None
+        if headers == self._headers and keys is not None and self._keys is not None:
+            diff = diff_rows(self._keys, self._signatures, keys, signatures)
+        old_columns = self._columns
+        self._keys = keys
+        self._signatures = signatures
+
+        if diff is not None:
+            self._patchRows(diff, columns, agents.live_column)
+            return
+
+        if headers != self._headers or rows != self._rows:
+            self.beginResetModel()
+            self._headers = headers
+            self._columns = columns
+            self._rows = rows
+            self._fetched = min(rows, FETCH_BATCH)
+            self._resetLevels()
+            self.endResetModel()
+            return
+
+        changed = np.zeros(rows, dtype=bool)
+        for old, new in zip(old_columns, columns):
+            changed |= ~_same(old, new)
+        self._columns = columns
+        if changed.any():
+            self._resetLevels()
+
+        self._emitRows(np.flatnonzero(changed), 0, len(headers) - 1)
+
+    def _patchRows(self, diff, columns, live_column):
+        # Agents logging in or out become row inserts and removals, and only
+        # kept agents whose row hash changed are repainted, so the selection
+        # and scroll position survive a refresh. The view may read any row
+        # between the signals, so removals go out against the old arrays and
+        # inserts against the new ones, with _row_map skipping the rows not
+        # yet removed or inserted.
+        old_columns = self._columns
+        old_levels = self._levels
+        present = np.ones(self._rows, dtype=bool)
+        self._row_map = np.arange(self._rows)
+        for first, last in reversed(diff.removed):
+            shown = min(last, self._fetched - 1)
+            if first <= shown:
+                self.beginRemoveRows(QModelIndex(), first, shown)
+            present[first:last + 1] = False
+            self._row_map = np.flatnonzero(present)
+            self._rows = len(self._row_map)
+            if first <= shown:
+                self._fetched -= shown - first + 1
+                self.endRemoveRows()
+
+        self._columns = columns
+        self._resetLevels()
+        present = np.zeros(len(diff.kept_new) + sum(last - first + 1 for first, last in diff.inserted), dtype=bool)
+        present[diff.kept_new] = True
+        self._row_map = diff.kept_new
+        for first, last in diff.inserted:
+            count = last - first + 1
+            if first < self._fetched:
+                shown = count
+            elif first == self._fetched == self._rows:
+                # Rows appended to a fully fetched table: one batch now, the
+                # rest through fetchMore like any other unfetched rows
+                shown = min(count, FETCH_BATCH)
+            else:
+                shown = 0
+            if shown:
+                self.beginInsertRows(QModelIndex(), first, first + shown - 1)
+            present[first:last + 1] = True
+            self._row_map = np.flatnonzero(present)
+            self._rows = len(self._row_map)
+            if shown:
+                self._fetched += shown
+                self.endInsertRows()
+        self._row_map = None
+
+        kept_old, kept_new = diff.kept_old, diff.kept_new
+        self._emitRows(diff.updated, 0, len(self._headers) - 1)
+        if live_column is not None:
+            old_live, labels = old_columns[live_column]
+            new_live = columns[live_column][0]
+            ticked = ~_same((old_live[kept_old], labels), (new_live[kept_new], None))
+            self._emitRows(kept_new[ticked], live_column, live_column, [Qt.DisplayRole])
+        col = self._thresholdIndex()
+        if col is not None and self._levels is not None:
+            before = NO_COLOR if old_levels is None else old_levels[kept_old]
+            recoloured = kept_new[before != self._levels[kept_new]]
+            self._emitRows(recoloured, col, col, [Qt.BackgroundRole])
+
+    def _emitRows(self, rows, first_col, last_col, roles=()):
+        # Rows the view hasn't fetched yet are read fresh when it gets there
+        rows = rows[rows < self._fetched]
+        for first, last in runs(rows):
+            self.dataChanged.emit(self.index(first, first_col), self.index(last, last_col), list(roles))
+
+    def _resetLevels(self):
+        # Levels are cached per frame and threshold pair
+        self._durations = None
+        self._level_cache = {}
+        self._levels = self._classify()
+
+
+class AgentTableView(QTableView):
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        # Fixed, uniform rows: the view never asks a row for its size hint,
+        # so scrolling and resizing cost the same at 100 rows or 100k
+        vertical = self.verticalHeader()
+        vertical.setSectionResizeMode(QHeaderView.Fixed)
+        vertical.setDefaultSectionSize(self.fontMetrics().height() + 8)
+        self.horizontalHeader().setSectionResizeMode(QHeaderView.Interactive)
+        self.setWordWrap(False)
+        self.setCornerButtonEnabled(False)
+
+    def paintEvent(self, event):
+        model = self.model()
+        with profiler.span("paint", rows=model.rowCount() if model is not None else 0):
+            super().paintEvent(event)
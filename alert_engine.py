@@ -0,0 +1,267 @@
+import heapq
+import time
+from collections import deque, namedtuple
+from datetime import datetime
+import numpy as np
+from PyQt5.QtCore import QObject, QTimer, pyqtSignal
+from PyQt5.QtWidgets import QHBoxLayout, QLabel, QPushButton, QSystemTrayIcon, QTableWidget, QTableWidgetItem, QVBoxLayout, QWidget
+from agent_store import KEY_COLUMN
+from row_diff import diff_rows
+
+# Statuses watched by the duration rule, each against the red threshold
+DURATION_STATUSES = ("AUX", "Unaligned AUX", "Break")
+SL_TARGET = 80.0
+# The same alert is not raised again this soon after it last fired
+COOLDOWN = 15 * 60
+POPUPS_PER_MINUTE = 3
+MAX_ALERTS = 500
+RULE_NAMES = {"duration": "Over threshold", "sl": "SL below target", "dropped": "Dropped rising"}
+
+Alert = namedtuple("Alert", ["raised", "rule", "account", "subject", "message"])
+
+
+class AlertEngine(QObject):
+    # Rules are evaluated from what changed rather than by rescanning:
+    # agents are matched to the last version by row hash and only changed
+    # rows touch the duration index, a heap of the times agents cross their
+    # limit; SL and dropped rules only look at accounts whose summary moved
+    raised = pyqtSignal(object)
+
+    def __init__(self, parent=None, sl_target=SL_TARGET, cooldown=COOLDOWN):
+        super().__init__(parent)
+        self.sl_target = sl_target
+        self.cooldown = cooldown
+        self.alerts = deque(maxlen=MAX_ALERTS)
+        self._limits = {}
+        self._agents = {}  # login -> (status, since, account, seq)
+        self._due = []
+        self._seq = 0
+        self._keys = None
+        self._signatures = None
+        self._logins = None
+        self._sl = {}
+        self._dropped = {}
+        self._active = set()
+        self._last_raised = {}
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.timeout.connect(self._check)
+
+    def setDurationLimit(self, minutes, statuses=DURATION_STATUSES):
+        limits = {status: minutes for status in statuses}
+        if limits == self._limits:
+            return
+        self._limits = limits
+        # Every deadline moves, so the index is rebuilt once
+        self._active = {key for key in self._active if key[0] != "duration"}
+        self._due = []
+        for login, (status, since, account, _) in list(self._agents.items()):
+            self._track(login, status, since, account)
+        self._check()
+
+    def setAgents(self, store):
+        if store is None or store.since is None or KEY_COLUMN not in store.headers:
+            return
+        logins = store.columns[store.headers.index(KEY_COLUMN)][0]
+        changed, removed = self._changes(store, logins)
+
+        statuses = store.codes("Status")
+        accounts = store.codes("Account")
+        for i in changed.tolist():
+            status = statuses[1][statuses[0][i]] if statuses is not None else ""
+            account = accounts[1][accounts[0][i]] if accounts is not None else ""
+            self._track(logins[i], status, float(store.since[i]), account)
+        for login in removed:
+            self._agents.pop(login, None)
+            self._active.discard(("duration", login))
+        self._keys, self._signatures, self._logins = store.keys, store.signatures, logins
+        # Stale heap entries are skipped when popped; compact once they dominate
+        if len(self._due) > 4 * max(len(self._agents), 1000):
+            self._due = [entry for entry in self._due if self._agents.get(entry[2], (None,) * 4)[3] == entry[1]]
+            heapq.heapify(self._due)
+        self._check()
+
+    def _changes(self, store, logins):
+        # (new rows to re-track, logins gone since the last version). An
+        # export in the same order costs one vectorized signature compare;
+        # agents logging in or out go through the table's keyed diff, and
+        # only a reordered file falls back to a sorted lookup.
+        if self._keys is None or store.keys is None or not len(self._keys):
+            removed = [] if self._logins is None else sorted(set(self._logins) - set(logins))
+            return np.arange(store.size), removed
+        if np.array_equal(self._keys, store.keys):
+            return np.flatnonzero(self._signatures != store.signatures), []
+        diff = diff_rows(self._keys, self._signatures, store.keys, store.signatures)
+        if diff is not None:
+            inserted = [np.arange(first, last + 1) for first, last in diff.inserted]
+            removed = [login for first, last in diff.removed for login in self._logins[first:last + 1]]
+            return np.concatenate([diff.updated] + inserted), removed
+        order = np.argsort(self._keys)
+        known = self._keys[order]
+        position = np.minimum(np.searchsorted(known, store.keys), len(known) - 1)
+        same = (known[position] == store.keys) & (self._signatures[order][position] == store.signatures)
+        return np.flatnonzero(~same), self._logins[~np.isin(self._keys, store.keys)].tolist()
+
+    def _track(self, login, status, since, account):
+        previous = self._agents.get(login)
+        if previous is None or previous[0] != status:
+            self._active.discard(("duration", login))
+        self._seq += 1
+        self._agents[login] = (status, since, account, self._seq)
+        limit = self._limits.get(status)
+        if limit is not None and since == since:
+            heapq.heappush(self._due, (since + limit * 60, self._seq, login))
+
+    def _check(self):
+        now = time.monotonic()
+        fired = []
+        while self._due and self._due[0][0] <= now:
+            _, seq, login = heapq.heappop(self._due)
+            agent = self._agents.get(login)
+            if agent is None or agent[3] != seq:
+                continue
+            status, since, account, _ = agent
+            message = f"{login} in {status} for {int((now - since) // 60)} min"
+            fired.append(self._raise("duration", login, account, login, message))
+        if self._due:
+            wait = (self._due[0][0] - now) * 1000
+            self._timer.start(int(min(max(wait, 0) + 1, 2 ** 31 - 1)))
+        else:
+            self._timer.stop()
+        self._emit(fired)
+
+    def setSummaries(self, sl=None, dropped=None):
+        # Summary dicts are republished with fresh entries only for the
+        # accounts that got new intervals, so identity tells what moved
+        fired = []
+        for account, summary in (sl or {}).items():
+            if self._sl.get(account) is summary:
+                continue
+            self._sl[account] = summary
+            if summary.latest_sl is not None and summary.latest_sl < self.sl_target:
+                message = f"{account} SL {summary.latest_sl:.1f}% below {self.sl_target:g}% ({summary.interval})"
+                fired.append(self._raise("sl", account, account, summary.interval, message))
+            else:
+                self._active.discard(("sl", account))
+        for account, summary in (dropped or {}).items():
+            previous = self._dropped.get(account)
+            if previous is summary:
+                continue
+            self._dropped[account] = summary
+            if previous is not None and (summary.dropped_latest or 0) > (previous.dropped_latest or 0):
+                message = f"{account} dropped intervals up to {summary.dropped_latest} ({summary.interval})"
+                fired.append(self._raise("dropped", account, account, summary.interval, message))
+            else:
+                self._active.discard(("dropped", account))
+        self._emit(fired)
+
+    def _raise(self, rule, key, account, subject, message):
+        # One alert per episode: nothing more until the condition clears,
+        # and a cleared alert stays quiet for the cooldown
+        key = (rule, key)
+        if key in self._active:
+            return None
+        self._active.add(key)
+        now = time.monotonic()
+        last = self._last_raised.get(key)
+        if last is not None and now - last < self.cooldown:
+            return None
+        self._last_raised[key] = now
+        alert = Alert(time.time(), rule, account, subject, message)
+        self.alerts.appendleft(alert)
+        return alert
+
+    def _emit(self, fired):
+        fired = [alert for alert in fired if alert is not None]
+        if fired:
+            self.raised.emit(fired)
+
+
+class AlertTray(QObject):
+    # System-tray popups for new alerts, at most POPUPS_PER_MINUTE; alerts
+    # arriving in between are folded into the next popup
+    def __init__(self, engine, icon, on_click=None, parent=None):
+        super().__init__(parent)
+        self.tray = None
+        if QSystemTrayIcon.isSystemTrayAvailable():
+            self.tray = QSystemTrayIcon(icon, self)
+            self.tray.setToolTip("RTM alerts")
+            if on_click is not None:
+                self.tray.messageClicked.connect(on_click)
+                self.tray.activated.connect(lambda _: on_click())
+            self.tray.show()
+        self._shown = deque()
+        self._pending = []
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.timeout.connect(self._flush)
+        engine.raised.connect(self.notify)
+
+    def notify(self, alerts):
+        if self.tray is None:
+            return
+        self._pending.extend(alerts)
+        self._flush()
+
+    def _flush(self):
+        now = time.monotonic()
+        while self._shown and now - self._shown[0] >= 60:
+            self._shown.popleft()
+        if not self._pending:
+            return
+        if len(self._shown) >= POPUPS_PER_MINUTE:
+            self._timer.start(int((60 - (now - self._shown[0])) * 1000) + 1)
+            return
+        first = self._pending[0]
+        text = first.message if len(self._pending) == 1 else f"{first.message}\n+{len(self._pending) - 1} more alerts"
+        title = RULE_NAMES[first.rule] if len(self._pending) == 1 else f"{len(self._pending)} alerts"
+        self.tray.showMessage(title, text, QSystemTrayIcon.Warning)
+        self._shown.append(now)
+        self._pending = []
+
+
+class AlertPanel(QWidget):
+    def __init__(self, engine, parent=None):
+        super().__init__(parent)
+        self.engine = engine
+        self._dirty = True
+        layout = QVBoxLayout(self)
+        top = QHBoxLayout()
+        self.count_label = QLabel()
+        top.addWidget(self.count_label)
+        top.addStretch()
+        clear_button = QPushButton("Clear")
+        clear_button.clicked.connect(self.clearAlerts)
+        top.addWidget(clear_button)
+        layout.addLayout(top)
+        self.table = QTableWidget(0, 5)
+        self.table.setHorizontalHeaderLabels(["Time", "Rule", "Account", "Subject", "Message"])
+        self.table.setEditTriggers(QTableWidget.NoEditTriggers)
+        self.table.horizontalHeader().setStretchLastSection(True)
+        layout.addWidget(self.table)
+        engine.raised.connect(self.onRaised)
+
+    def onRaised(self, alerts):
+        self._dirty = True
+        self.updateTable()
+
+    def clearAlerts(self):
+        self.engine.alerts.clear()
+        self._dirty = True
+        self.updateTable()
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.updateTable()
+
+    def updateTable(self):
+        if not self._dirty or not self.isVisible():
+            return
+        self._dirty = False
+        alerts = list(self.engine.alerts)
+        self.count_label.setText(f"{len(alerts)} alerts")
+        self.table.setRowCount(len(alerts))
+        for i, alert in enumerate(alerts):
+            values = (f"{datetime.fromtimestamp(alert.raised):%H:%M:%S}", RULE_NAMES[alert.rule], alert.account, alert.subject, alert.message)
+            for j, value in enumerate(values):
+                self.table.setItem(i, j, QTableWidgetItem(str(value)))
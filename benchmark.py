@@ -0,0 +1,293 @@
+import argparse
+import importlib
+import json
+import os
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import numpy as np
+
+VARIANTS = ["main", "main2", "try3", "try4"]
+SIZES = [1000, 10000, 100000]
+ACCOUNTS = ["101 Account", "Non Voice Account", "SMB Account", "Smiles Account", "Prestige Account"]
+STATUSES = ["Available", "AUX", "Break", "Offline", "Unaligned AUX"]
+REASONS = ["High AUX usage", "Excessive breaks", "Low staffing", "System downtime"]
+INTERVALS_PER_DAY = 48
+STAGES = ["parse", "index", "filter", "populate", "paint", "total"]
+# Benchmark stage -> profiler span names summed into it
+SPANS = {"parse": ("stat", "parse"), "index": ("derive",), "filter": ("filter",), "populate": ("model",), "paint": ("paint",)}
+
+
+def _write_csv(path, header, rows):
+    # Same shape as the ACD exports: UTF-8 BOM and CRLF line endings
+    with open(path, "w", encoding="utf-8-sig", newline="") as f:
+        f.write(",".join(header) + "\r\n")
+        f.writelines(",".join(map(str, row)) + "\r\n" for row in rows)
+
+
+def _interval(i):
+    start = (i % INTERVALS_PER_DAY) * 30
+    end = start + 30
+    return f"{start // 60:02d}:{start % 60:02d}-{end // 60 % 24:02d}:{end % 60:02d}"
+
+
+def write_agents(folder, agents, rng):
+    login_ids = [f"Agent {i}" if i % 3 else str(20000 + i) for i in range(agents)]
+    statuses = rng.choice(STATUSES, agents)
+    durations = rng.integers(0, 60, agents)
+    accounts = rng.choice(ACCOUNTS, agents)
+    _write_csv(os.path.join(folder, "agent_status.csv"), ["Login ID", "Status", "Duration (min)", "Account"],
+               zip(login_ids, statuses, durations, accounts))
+    return statuses
+
+
+def generate(folder, agents, days=30, seed=0):
+    rng = np.random.default_rng(seed)
+    statuses = write_agents(folder, agents, rng)
+    intervals = days * INTERVALS_PER_DAY
+    sl_rows = [(account, _interval(i), round(rng.uniform(60, 100), 1), int(rng.integers(0, 6)))
+               for i in range(intervals) for account in ACCOUNTS]
+    _write_csv(os.path.join(folder, "sl_data.csv"), ["Account", "Interval", "SL %", "Dropped Intervals"], sl_rows)
+    dropped_rows = [(account, interval, sl, dropped, REASONS[dropped % len(REASONS)])
+                    for account, interval, sl, dropped in sl_rows if dropped]
+    _write_csv(os.path.join(folder, "dropped_intervals.csv"),
+               ["Account", "Interval", "Service Level", "Dropped Intervals", "Reason"], dropped_rows)
+    risky_rows = [(interval, account, sl, dropped * 4, "High" if sl < 80 else "Medium" if sl < 90 else "Low")
+                  for account, interval, sl, dropped in sl_rows]
+    _write_csv(os.path.join(folder, "risky_intervals.csv"),
+               ["Time Interval", "Account", "Service Level", "Dropped Calls", "Risk Level"], risky_rows)
+    return statuses
+
+
+def churn(folder, agents, tick, churn_rate=0.01):
+    # Rewrite agent_status.csv with a small share of agents changing status,
+    # and append one interval to sl_data.csv as the export job would
+    rng = np.random.default_rng(tick)
+    write_agents(folder, agents, np.random.default_rng(0))
+    path = os.path.join(folder, "agent_status.csv")
+    with open(path, "r", encoding="utf-8-sig", newline="") as f:
+        lines = f.read().split("\r\n")
+    for row in rng.integers(1, agents + 1, max(1, int(agents * churn_rate))):
+        login_id, _, duration, account = lines[row].split(",")
+        lines[row] = ",".join((login_id, str(rng.choice(STATUSES)), duration, account))
+    with open(path, "w", encoding="utf-8-sig", newline="") as f:
+        f.write("\r\n".join(lines))
+    with open(os.path.join(folder, "sl_data.csv"), "a", encoding="utf-8", newline="") as f:
+        f.write(f"{ACCOUNTS[tick % len(ACCOUNTS)]},{_interval(tick)},{rng.uniform(60, 100):.1f},{tick % 4}\r\n")
+
+
+def _peak_rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def run_variant(variant, agents, iterations):
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    from PyQt5.QtWidgets import QApplication, QMessageBox
+    from profiler import profiler
+
+    # A modal error box would block a headless run
+    QMessageBox.critical = staticmethod(lambda parent, title, text: print(text, file=sys.stderr))
+
+    app = QApplication.instance() or QApplication([])
+    folder = tempfile.mkdtemp(prefix=f"rtm-bench-{variant}-")
+    generate(folder, agents)
+    os.chdir(folder)
+
+    start = time.perf_counter()
+    profiler.started = start
+    module = importlib.import_module(variant)
+    done = []
+
+    def wait():
+        deadline = time.perf_counter() + 120
+        while not done and time.perf_counter() < deadline:
+            app.processEvents()
+            time.sleep(0.0005)
+        if not done:
+            raise TimeoutError(f"{variant} did not finish a refresh")
+        done.clear()
+
+    window = module.RTMApp()
+    window.show()
+    # Dashboards that defer the data layer create the store after the first frame
+    deadline = time.perf_counter() + 30
+    while window.store is None and time.perf_counter() < deadline:
+        app.processEvents()
+    window.scheduler.setPaused("benchmark", True)
+    window.store.updated.connect(lambda snapshot: done.append(time.perf_counter()))
+    wait()
+    startup = time.perf_counter() - start
+    first_frame = profiler.last("first_frame")
+    view = getattr(window, "agent_status_table", None) or window.table
+
+    samples = {stage: [] for stage in STAGES}
+    agents_version = window.store.snapshot.versions.get("agents")
+    for tick in range(iterations):
+        churn(folder, agents, tick + 1)
+        start = time.perf_counter()
+        window.loadData()
+        wait()
+        # A tick that didn't reload the agents would time a refresh that did nothing
+        version = window.store.snapshot.versions.get("agents")
+        if version == agents_version:
+            raise RuntimeError(f"{variant}: agent_status.csv was not reloaded on tick {tick + 1}")
+        agents_version = version
+        if hasattr(window, "loadSLData"):
+            window.loadSLData()
+        view.viewport().repaint()
+        app.processEvents()
+        total = (time.perf_counter() - start) * 1000
+        spans = profiler.refreshes(1).get(profiler.last_tick, {})
+        for stage, names in SPANS.items():
+            samples[stage].append(sum(spans.get(name, 0.0) for name in names))
+        samples["total"].append(total)
+
+    window.close()
+    os.chdir(os.path.dirname(folder))
+    shutil.rmtree(folder, ignore_errors=True)
+    result = {"variant": variant, "agents": agents, "iterations": iterations,
+              "startup_ms": startup * 1000, "peak_rss_mb": _peak_rss_mb(),
+              "first_frame_ms": first_frame.duration * 1000 if first_frame is not None else None}
+    for stage, values in samples.items():
+        result[stage] = {"p50": float(np.percentile(values, 50)), "p99": float(np.percentile(values, 99))}
+    return result
+
+
+def run_reader(reader, agents, iterations):
+    # One reader in a fresh process: startup is importing the data layer and
+    # the first read of agent_status.csv and sl_data.csv into an AgentStore,
+    # a tick is re-reading both after churn()
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    folder = tempfile.mkdtemp(prefix="rtm_read_")
+    try:
+        generate(folder, agents)
+        start = time.perf_counter()
+        from agent_store import AgentStore
+        from csv_reader import CsvReader
+        from data_source import CsvSource, SizedReader
+        # "sized" is what SnapshotStore uses: the agents export picks its
+        # reader by size, the tailed sl_data.csv always uses the stdlib one
+        make = {"csv": CsvReader, "sized": SizedReader}.get(reader, lambda: None)
+        tailed = CsvReader if reader == "sized" else make
+        sources = [CsvSource(os.path.join(folder, "agent_status.csv"), reader=make(), tail=False),
+                   CsvSource(os.path.join(folder, "sl_data.csv"), reader=tailed(), usecols=lambda c: c in ("Account", "Interval", "SL %"))]
+        for source in sources:
+            source.poll()
+        AgentStore(sources[0].frame)
+        startup = (time.perf_counter() - start) * 1000
+        samples = []
+        for tick in range(1, iterations + 1):
+            churn(folder, agents, tick)
+            start = time.perf_counter()
+            reloaded = [source.poll() for source in sources]
+            AgentStore(sources[0].frame)
+            samples.append((time.perf_counter() - start) * 1000)
+            if not reloaded[0]:
+                raise RuntimeError(f"{reader}: agent_status.csv was not reloaded on tick {tick}")
+    finally:
+        shutil.rmtree(folder, ignore_errors=True)
+    return {"reader": reader, "agents": agents, "startup_ms": startup, "p50": float(np.percentile(samples, 50)),
+            "p99": float(np.percentile(samples, 99)), "pandas": "pandas" in sys.modules, "peak_rss_mb": _peak_rss_mb()}
+
+
+def run_readers(sizes, iterations):
+    print(f"{'reader':<8}{'agents':>8}{'startup':>10}{'tick p50':>10}{'tick p99':>10}{'RSS MB':>9}  pandas")
+    for agents in sizes:
+        for reader in ("pandas", "csv", "sized"):
+            out = subprocess.run([sys.executable, os.path.abspath(__file__), "--read", reader, str(agents),
+                                  "--iterations", str(iterations)], capture_output=True, text=True)
+            if out.returncode != 0:
+                print(f"{reader:<8}{agents:>8}  failed: {out.stderr.strip().splitlines()[-1:]}")
+                continue
+            r = json.loads(out.stdout.strip().splitlines()[-1])
+            print(f"{reader:<8}{agents:>8}{r['startup_ms']:>10.1f}{r['p50']:>10.2f}{r['p99']:>10.2f}{r['peak_rss_mb']:>9.1f}  {'yes' if r['pandas'] else 'no'}")
+
+
+def run_sites(sites, agents, iterations):
+    # Parses `sites` separate exports per tick through SiteIngest, once per
+    # worker count, to show how ingestion scales with cores
+    from site_ingest import SiteIngest
+    folder = tempfile.mkdtemp(prefix="rtm_sites_")
+    try:
+        rng = np.random.default_rng(0)
+        paths = []
+        for i in range(sites):
+            os.makedirs(os.path.join(folder, str(i)))
+            write_agents(os.path.join(folder, str(i)), agents, rng)
+            paths.append(os.path.join(folder, str(i), "agent_status.csv"))
+        cores = os.cpu_count() or 1
+        counts = sorted({1, max(1, cores // 2), cores})
+        print(f"{'workers':<8}{'sites':>6}{'agents':>8}{'tick p50':>10}{'tick p99':>10}{'rows/s':>12}")
+        for workers in counts:
+            ingest = SiteIngest(paths, ACCOUNTS, workers=workers)
+            ingest.update()  # Starts the workers
+            samples = []
+            for _ in range(iterations):
+                for path in paths:
+                    os.utime(path, ns=(time.time_ns(), time.time_ns()))
+                start = time.perf_counter()
+                ingest.update()
+                samples.append((time.perf_counter() - start) * 1000)
+            ingest.close()
+            p50 = float(np.percentile(samples, 50))
+            print(f"{workers:<8}{sites:>6}{agents:>8}{p50:>10.1f}{float(np.percentile(samples, 99)):>10.1f}{sites * agents / p50 * 1000:>12.0f}")
+    finally:
+        shutil.rmtree(folder, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless refresh benchmark for the RTM dashboards")
+    parser.add_argument("--variants", nargs="+", default=VARIANTS, choices=VARIANTS)
+    parser.add_argument("--sizes", nargs="+", type=int, default=SIZES)
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--json", help="also write the results to this file")
+    parser.add_argument("--sites", type=int, help="benchmark multi-site ingestion over this many exports instead")
+    parser.add_argument("--readers", action="store_true", help="compare the pandas, stdlib and size-picked CSV readers instead")
+    parser.add_argument("--read", nargs=2, metavar=("READER", "AGENTS"), help=argparse.SUPPRESS)
+    parser.add_argument("--run", nargs=2, metavar=("VARIANT", "AGENTS"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run:
+        print(json.dumps(run_variant(args.run[0], int(args.run[1]), args.iterations)))
+        return
+    if args.read:
+        print(json.dumps(run_reader(args.read[0], int(args.read[1]), args.iterations)))
+        return
+    if args.readers:
+        run_readers(args.sizes, args.iterations)
+        return
+    if args.sites:
+        for agents in args.sizes:
+            run_sites(args.sites, agents, args.iterations)
+        return
+
+    results = []
+    header = f"{'variant':<8}{'agents':>8}{'1st frame':>10}{'startup':>10}" + "".join(f"{stage + ' p50/p99':>22}" for stage in STAGES) + f"{'RSS MB':>9}"
+    print(header)
+    for variant in args.variants:
+        for agents in args.sizes:
+            # One process per run so peak RSS and caches don't leak between runs
+            out = subprocess.run([sys.executable, os.path.abspath(__file__), "--run", variant, str(agents),
+                                  "--iterations", str(args.iterations)], capture_output=True, text=True)
+            if out.returncode != 0:
+                print(f"{variant:<8}{agents:>8}  failed: {out.stderr.strip().splitlines()[-1:]}")
+                continue
+            result = json.loads(out.stdout.strip().splitlines()[-1])
+            results.append(result)
+            first_frame = result["first_frame_ms"]
+            row = f"{variant:<8}{agents:>8}" + (f"{first_frame:>10.1f}" if first_frame is not None else f"{'-':>10}")
+            row += f"{result['startup_ms']:>10.1f}"
+            row += "".join(f"{result[stage]['p50']:>12.2f}/{result[stage]['p99']:<9.2f}" for stage in STAGES)
+            print(row + f"{result['peak_rss_mb']:>9.1f}")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+import json
+import os
+from collections import namedtuple
+import numpy as np
+from data_source import PandasReader
+
+CACHE_DIR = ".rtm_cache"
+
+# The rows parsed from the first `offset` bytes of a file, with the file's
+# stat when they were stored and a digest of those bytes, so a source can
+# tell whether the file still starts with them; header and check are the
+# source's tailing state at the offset
+CachedFrame = namedtuple("CachedFrame", ["frame", "stat", "header", "offset", "check", "digest"])
+
+
+def _wanted(names, usecols):
+    if usecols is None:
+        return list(names)
+    if callable(usecols):
+        return [name for name in names if usecols(name)]
+    return [name for name in names if name in usecols]
+
+
+class ColumnCache:
+    # One directory per source file: meta.json plus one .npy per column.
+    # Text columns are stored as integer codes with their categories in the
+    # meta file so every column can be memory-mapped. The meta file also
+    # records how many bytes of the CSV the columns cover, so a file that
+    # has grown since only needs the rest parsed.
+    def __init__(self, cache_dir=CACHE_DIR):
+        self.cache_dir = cache_dir
+
+    def _dir(self, path):
+        return os.path.join(self.cache_dir, os.path.basename(path))
+
+    def load(self, path, usecols=None, reader=None):
+        # The frame is built by the source's reader, so a stdlib-read source
+        # gets a CsvTable back and pandas is never imported for it
+        folder = self._dir(path)
+        try:
+            with open(os.path.join(folder, "meta.json"), encoding="utf-8") as f:
+                meta = json.load(f)
+            header, check = bytes.fromhex(meta["header"]), bytes.fromhex(meta["check"])
+            offset, digest = meta["offset"], meta["digest"]
+        except (OSError, ValueError, KeyError):
+            return None  # Missing, or written before offsets were recorded
+
+        columns = {column["name"]: column for column in meta["columns"]}
+        names = _wanted(meta["order"], usecols)
+        if usecols is not None and not callable(usecols) and len(names) != len(usecols):
+            return None
+
+        data = {}
+        try:
+            for name in names:
+                column = columns[name]
+                values = np.load(os.path.join(folder, column["file"]), mmap_mode="r")
+                data[name] = (values, column.get("categories"))
+        except (OSError, ValueError, KeyError):
+            return None
+        frame = (PandasReader() if reader is None else reader).frame(names, data)
+        return CachedFrame(frame, tuple(meta["stat"]), header, offset, check, digest)
+
+    def store(self, path, stat, df, header, offset, check, digest):
+        columns = []
+        arrays = []
+        for i, name in enumerate(df.columns):
+            values = np.asarray(df[name])
+            if values.dtype.kind in "biuf":
+                arrays.append(values)
+                columns.append({"name": str(name), "file": f"{i}.npy"})
+                continue
+            values = values.astype(object)
+            missing = np.asarray(np.equal(values, None) | (values != values), dtype=bool)
+            try:
+                categories, codes = np.unique(values[~missing], return_inverse=True)
+            except TypeError:
+                return False  # Mixed types in one column
+            if not all(isinstance(c, str) for c in categories):
+                return False
+            out = np.full(len(values), -1, dtype=np.int32)
+            out[~missing] = codes
+            arrays.append(out)
+            columns.append({"name": str(name), "file": f"{i}.npy", "categories": [str(c) for c in categories]})
+
+        folder = self._dir(path)
+        try:
+            os.makedirs(folder, exist_ok=True)
+            if os.path.exists(os.path.join(folder, "meta.json")):
+                os.remove(os.path.join(folder, "meta.json"))
+            for column, values in zip(columns, arrays):
+                tmp = os.path.join(folder, column["file"] + ".tmp")
+                with open(tmp, "wb") as f:
+                    np.save(f, values)
+                os.replace(tmp, os.path.join(folder, column["file"]))
+            meta = {"stat": list(stat), "header": header.hex(), "offset": offset, "check": check.hex(), "digest": digest,
+                    "order": [c["name"] for c in columns], "columns": columns}
+            tmp = os.path.join(folder, "meta.json.tmp")
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(meta, f)
+            os.replace(tmp, os.path.join(folder, "meta.json"))
+        except OSError:
+            return False  # A mapped file can't be replaced on some platforms; keep using the CSV
+        return True
@@ -0,0 +1,137 @@
+import csv
+import io
+import numpy as np
+
+
+def _typed(cells):
+    # int64 when every cell is an integer, float64 when every cell is a
+    # number or empty (empty becomes NaN), otherwise text with NaN for empty
+    strings = np.array(cells, dtype=str)
+    try:
+        return strings.astype(np.int64)
+    except ValueError:
+        pass
+    blank = strings == ""
+    try:
+        return np.where(blank, "nan", strings).astype(np.float64)
+    except ValueError:
+        pass
+    values = np.array(cells, dtype=object)
+    values[blank] = np.nan
+    return values
+
+
+def _wanted(names, usecols):
+    if usecols is None:
+        return list(names)
+    if callable(usecols):
+        return [name for name in names if usecols(name)]
+    return [name for name in names if name in usecols]
+
+
+class CsvTable:
+    # The slice of the DataFrame interface the polling path uses: columns,
+    # one array per column by name, len, attrs and iloc row slices. Anything
+    # needing more (the analytics pages) calls to_pandas().
+    def __init__(self, columns, data, length, attrs=None):
+        self.columns = list(columns)
+        self._data = data
+        self._length = length
+        self.attrs = {} if attrs is None else attrs
+
+    def __len__(self):
+        return self._length
+
+    def __getitem__(self, name):
+        return self._data[name]
+
+    @property
+    def empty(self):
+        return not self._length or not self.columns
+
+    @property
+    def iloc(self):
+        return _RowSlicer(self)
+
+    def to_pandas(self):
+        import pandas as pd
+        frame = pd.DataFrame({name: self._data[name] for name in self.columns}, columns=self.columns)
+        frame.attrs.update(self.attrs)
+        return frame
+
+
+class _RowSlicer:
+    def __init__(self, table):
+        self.table = table
+
+    def __getitem__(self, rows):
+        table = self.table
+        data = {name: values[rows] for name, values in table._data.items()}
+        return CsvTable(table.columns, data, len(range(table._length)[rows]), dict(table.attrs))
+
+
+def _grid(text, names):
+    # Unquoted exports (the usual case) split straight into a rows x columns
+    # grid; anything quoted or ragged goes through the csv module
+    if '"' not in text:
+        lines = [line for line in text.replace("\r\n", "\n").split("\n") if line]
+        header = names
+        if header is None:
+            header = lines[0].split(",") if lines else []
+            lines = lines[1:]
+        separators = len(header) - 1
+        if header and all(line.count(",") == separators for line in lines):
+            fields = ",".join(lines).split(",") if lines else []
+            return header, np.array(fields, dtype=object).reshape(len(lines), len(header))
+    rows = list(csv.reader(io.StringIO(text)))
+    if names is None:
+        names = rows[0] if rows else []
+        rows = rows[1:]
+    width = len(names)
+    for row in rows:
+        if len(row) > width:
+            # Same as pandas: short rows are padded, long ones are an error
+            raise ValueError(f"Expected {width} fields, saw {len(row)}")
+    rows = [row if len(row) == width else row + [""] * (width - len(row)) for row in rows if row]
+    grid = np.empty((len(rows), width), dtype=object)
+    if rows:
+        grid[:] = rows
+    return names, grid
+
+
+def read_table(data, names=None, usecols=None):
+    # data is a whole file (UTF-8 BOM and header included), or with names
+    # given, header-less rows appended to one
+    names, grid = _grid(data.decode("utf-8-sig"), names)
+    wanted = _wanted(names, usecols)
+    columns = {name: _typed(grid[:, i]) for i, name in enumerate(names) if name in wanted}
+    return CsvTable(wanted, columns, len(grid))
+
+
+class CsvReader:
+    # Stdlib parser for CsvSource: no pandas import, typed NumPy columns
+    def read(self, data, usecols=None):
+        return read_table(data, usecols=usecols)
+
+    def names(self, header):
+        return read_table(header).columns if header.strip() else []
+
+    def chunk(self, data, names, columns, usecols=None):
+        chunk = read_table(data, names=names, usecols=usecols)
+        return CsvTable(columns, {name: chunk[name] for name in columns}, len(chunk))
+
+    def concat(self, frame, chunk):
+        data = {name: np.concatenate((frame[name], chunk[name])) for name in frame.columns}
+        return CsvTable(frame.columns, data, len(frame) + len(chunk), dict(frame.attrs))
+
+    def frame(self, names, columns):
+        # Cached columns from ColumnCache; text codes are decoded with -1
+        # (missing) picking a trailing NaN
+        data = {}
+        for name in names:
+            values, categories = columns[name]
+            if categories is None:
+                data[name] = np.asarray(values)
+            else:
+                data[name] = np.array(list(categories) + [np.nan], dtype=object)[values]
+        return CsvTable(names, data, len(data[names[0]]) if names else 0)
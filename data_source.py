@@ -0,0 +1,224 @@
+import hashlib
+import io
+import os
+from csv_reader import CsvReader, CsvTable
+from profiler import profiler
+
+# Bytes kept from just before the read offset; if they still match on the
+# next poll the file was appended to rather than rewritten.
+_CHECK_BYTES = 64
+
+# Up to about this size (~3k agents in agent_status.csv) the stdlib reader
+# parses a file faster than pandas does; past it pandas' C parser wins
+STDLIB_READ_LIMIT = 96 * 1024
+
+
+def _digest(f, length):
+    # Hash of the first `length` bytes of the file
+    f.seek(0)
+    digest = hashlib.blake2b(digest_size=16)
+    while length > 0:
+        block = f.read(min(length, 1 << 20))
+        if not block:
+            break
+        digest.update(block)
+        length -= len(block)
+    return digest.hexdigest()
+
+
+class PandasReader:
+    # pandas is imported on the first read, so sources using the stdlib
+    # reader (csv_reader.CsvReader) never load it
+    def read(self, data, **kwargs):
+        import pandas as pd
+        return pd.read_csv(io.BytesIO(data), encoding="utf-8-sig", **kwargs)
+
+    def names(self, header):
+        import pandas as pd
+        return list(pd.read_csv(io.BytesIO(header), encoding="utf-8-sig", nrows=0).columns)
+
+    def chunk(self, data, names, columns, **kwargs):
+        import pandas as pd
+        kwargs.pop("header", None)
+        # Columns are picked below; pandas' usecols check rejects a chunk
+        # whose only row is still being written and has too few fields
+        kwargs.pop("usecols", None)
+        chunk = pd.read_csv(io.BytesIO(data), header=None, names=names, encoding="utf-8", **kwargs)
+        return chunk[list(columns)]
+
+    def concat(self, frame, chunk):
+        import pandas as pd
+        return pd.concat([frame, chunk], ignore_index=True)
+
+    def frame(self, names, columns):
+        # columns: {name: (values, categories)} from ColumnCache; text comes
+        # as codes into categories
+        import pandas as pd
+        data = {}
+        for name in names:
+            values, categories = columns[name]
+            data[name] = values if categories is None else pd.Categorical.from_codes(values, categories)
+        return pd.DataFrame(data, columns=names, copy=False)
+
+
+class SizedReader:
+    # The stdlib reader for reads up to `limit` bytes and pandas past it, so
+    # small exports never import pandas and large ones keep its speed
+    def __init__(self, limit=STDLIB_READ_LIMIT):
+        self.limit = limit
+        self.small = CsvReader()
+        self.large = PandasReader()
+
+    def _pick(self, data):
+        return self.small if len(data) <= self.limit else self.large
+
+    def read(self, data, **kwargs):
+        return self._pick(data).read(data, **kwargs)
+
+    def names(self, header):
+        return self.small.names(header)
+
+    def chunk(self, data, names, columns, **kwargs):
+        return self._pick(data).chunk(data, names, columns, **kwargs)
+
+    def concat(self, frame, chunk):
+        if isinstance(frame, CsvTable) and isinstance(chunk, CsvTable):
+            return self.small.concat(frame, chunk)
+        frame, chunk = (part.to_pandas() if isinstance(part, CsvTable) else part for part in (frame, chunk))
+        return self.large.concat(frame, chunk)
+
+    def frame(self, names, columns):
+        # Cached columns aren't parsed at all, so size doesn't matter here
+        return self.small.frame(names, columns)
+
+
+class CsvSource:
+    # tail=False is for snapshot exports rewritten in place each time (like
+    # agent_status.csv): every change is a full reload, never an append
+    def __init__(self, path, cache=None, reader=None, tail=True, **read_kwargs):
+        self.path = path
+        self.cache = cache
+        self.tail = tail
+        self.reader = PandasReader() if reader is None else reader
+        self.read_kwargs = read_kwargs
+        self.frame = None
+        self.version = 0
+        self.appended = None  # rows added by the last change, None after a full reload
+        # Bumped whenever rows already handed out may have changed; consumers
+        # that follow appends must start over when it moves
+        self.reloads = 0
+        self._stat = None
+        self._header = b""
+        self._names = None
+        self._offset = 0
+        self._check = b""
+        self._partial_row = False
+
+    def poll(self):
+        name = os.path.basename(self.path)
+        with profiler.span("stat", name):
+            st = os.stat(self.path)
+        stat = (st.st_mtime_ns, st.st_size)
+        if self.frame is not None and stat == self._stat:
+            return False
+
+        with profiler.span("parse", name) as span, open(self.path, "rb") as f:
+            # A changed file that hasn't grown past the offset was rewritten,
+            # even if the bytes around the offset still match
+            if self.frame is not None and self.tail and st.st_size > self._offset and self._isAppend(f):
+                self._readAppended(f)
+                span["rows"] = self.appended
+            elif self.frame is not None or not self._readCached(f, stat):
+                self._readAll(f)
+                self._storeCache(stat)
+            if span["rows"] is None:
+                span["rows"] = len(self.frame)
+
+        self._stat = stat
+        # Lets consumers tell how old the exported values were when read
+        self.frame.attrs["mtime"] = st.st_mtime
+        self.version += 1
+        return True
+
+    def _isAppend(self, f):
+        if not self._offset:
+            return False
+        f.seek(0)
+        if f.read(len(self._header)) != self._header:
+            return False
+        f.seek(self._offset - len(self._check))
+        return f.read(len(self._check)) == self._check
+
+    def _readAll(self, f):
+        f.seek(0)
+        data = f.read()
+        header_end = data.find(b"\n") + 1
+        self._header = data[:header_end] if header_end else data
+        self.frame = self.reader.read(data, **self.read_kwargs)
+        self._names = self.reader.names(self._header)
+        self.appended = None
+        self.reloads += 1
+        self._advance(f, data, 0)
+
+    def _readCached(self, f, stat):
+        cached = self.cache.load(self.path, self.read_kwargs.get("usecols"), self.reader) if self.cache else None
+        if cached is None:
+            return False
+        # The cache covers the file up to its offset; if those bytes are
+        # unchanged only what was appended since is parsed. Hashing the
+        # prefix is far cheaper than parsing it.
+        if cached.offset > stat[1] or (not self.tail and cached.stat != stat):
+            return False
+        if cached.stat != stat and _digest(f, cached.offset) != cached.digest:
+            return False
+        self._header, self._offset, self._check = cached.header, cached.offset, cached.check
+        self._names = self.reader.names(cached.header)
+        self.frame = cached.frame
+        self._partial_row = False
+        if stat[1] > cached.offset:
+            self._readAppended(f)
+            if self.appended:
+                self._storeCache(stat)
+        self.appended = None
+        self.reloads += 1
+        return True
+
+    def _storeCache(self, stat):
+        if self.cache is None:
+            return
+        # A trailing partial row is left out; it's past the offset and gets
+        # parsed again with the rest of the tail
+        frame = self.frame.iloc[:-1] if self._partial_row else self.frame
+        with open(self.path, "rb") as f:
+            digest = _digest(f, self._offset)
+        self.cache.store(self.path, stat, frame, self._header, self._offset, self._check, digest)
+
+    def _readAppended(self, f):
+        f.seek(self._offset)
+        data = f.read()
+        frame = self.frame
+        if self._partial_row:
+            # The last row was parsed from an unterminated line; read it again in full
+            frame = frame.iloc[:-1]
+            self.reloads += 1
+        chunk = self._parseChunk(data)
+        if len(chunk):
+            frame = self.reader.concat(frame, chunk)
+        self.appended = len(frame) - len(self.frame)
+        self.frame = frame
+        self._advance(f, data, self._offset)
+
+    def _parseChunk(self, data):
+        if not data.strip():
+            return self.frame.iloc[:0]
+        return self.reader.chunk(data, self._names, self.frame.columns, **self.read_kwargs)
+
+    def _advance(self, f, data, start):
+        # Only move the offset past complete lines so a row still being
+        # written is re-read once its newline arrives
+        line_end = data.rfind(b"\n") + 1
+        self._partial_row = line_end < len(data) and bool(data[line_end:].strip())
+        self._offset = start + line_end
+        check_start = max(0, self._offset - _CHECK_BYTES)
+        f.seek(check_start)
+        self._check = f.read(self._offset - check_start)
@@ -0,0 +1,62 @@
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+
+
+class _TaskSignals(QObject):
+    # Created on the GUI thread, so emits from the worker arrive queued
+    done = pyqtSignal(int, object, object)
+
+
+class _LoadTask(QRunnable):
+    def __init__(self, generation, fn, args, loader):
+        super().__init__()
+        self.setAutoDelete(False)
+        self.generation = generation
+        self.fn = fn
+        self.args = args
+        self.loader = loader
+
+    def run(self):
+        result = error = None
+        if self.loader.isCurrent(self.generation):
+            try:
+                result = self.fn(*self.args)
+            except Exception as e:
+                error = e
+        self.loader._signals.done.emit(self.generation, result, error)
+
+
+class BackgroundLoader(QObject):
+    loaded = pyqtSignal(object)
+    failed = pyqtSignal(object)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._pool = QThreadPool(self)
+        # Sources keep per-file read state, so one load runs at a time
+        self._pool.setMaxThreadCount(1)
+        self._generation = 0
+        self._tasks = {}
+        self._signals = _TaskSignals(self)
+        self._signals.done.connect(self._onDone)
+
+    def isCurrent(self, generation):
+        return generation == self._generation
+
+    def submit(self, fn, *args):
+        self._generation += 1
+        # Anything still queued is already out of date
+        for generation, task in list(self._tasks.items()):
+            if self._pool.tryTake(task):
+                del self._tasks[generation]
+        task = _LoadTask(self._generation, fn, args, self)
+        self._tasks[self._generation] = task
+        self._pool.start(task)
+
+    def _onDone(self, generation, result, error):
+        self._tasks.pop(generation, None)
+        if not self.isCurrent(generation):
+            return
+        if error is not None:
+            self.failed.emit(error)
+        else:
+            self.loaded.emit(result)
@@ -1,11 +1,15 @@
 import sys
-import pandas as pd
 from PyQt5.QtWidgets import (
-    QApplication, QMainWindow, QPushButton, QTableWidget, QTableWidgetItem, 
+    QApplication, QMainWindow, QPushButton,
     QVBoxLayout, QWidget, QMessageBox, QComboBox, QLineEdit, QLabel, QHBoxLayout, QStackedWidget
 )
 from PyQt5.QtCore import QTimer
 from PyQt5.QtGui import QFont, QMovie
+from agent_filter import AgentFilter
+from agent_store import AgentStore, LastKnownSaver
+from agent_table import AgentTableModel, AgentTableView
+from profiler_panel import install_profiler
+from scheduler import RefreshScheduler
 
 class RTMApp(QMainWindow):
     def __init__(self):
@@ -14,12 +18,42 @@ class RTMApp(QMainWindow):
         self.setGeometry(100, 100, 900, 600)
         
         self.accounts = ["101 Account", "Non Voice Account", "SMB Account", "Smiles Account", "Prestige Account"]
+        self.store = None
+        self.scheduler = None
+        self.agent_filter = None
+        self.pages = {}
+        self.filter_timer = QTimer(self)
+        self.filter_timer.setSingleShot(True)
+        self.filter_timer.setInterval(250)
+        self.filter_timer.timeout.connect(self.applyFilters)
         self.initUI()
-        self.loadData()
-        
-        self.timer = QTimer(self)
-        self.timer.timeout.connect(self.loadData)
-        self.timer.start(10000)
+        self.showLastKnown()
+        self.profiler_overlay = install_profiler(self, on_first_frame=self.startData)
+
+    def showLastKnown(self):
+        # Paint the table from the last run while the real data loads
+        store = AgentStore.load()
+        if store is not None:
+            self.agent_filter = AgentFilter(store)
+            self.applyFilters()
+
+    def startData(self):
+        # pandas and the rest of the data layer load after the first frame
+        from column_cache import ColumnCache
+        from push_feed import install_feed
+        from snapshot import SnapshotStore
+        self.store = SnapshotStore(cache=ColumnCache(), parent=self)
+        self.store_saver = LastKnownSaver()
+        QApplication.instance().aboutToQuit.connect(self.store_saver.flush)
+        self.store.derive("agents", "agents", self.buildAgentFilter)
+        self.store.updated.connect(self.onSnapshot)
+        self.store.failed.connect(self.onSourceFailed)
+        self.scheduler = RefreshScheduler(self.store, self)
+        self.scheduler.watchWindow(self)
+        self.scheduler.watchStack(self.stack, [self.mainPage])
+        self.feed = install_feed(self.store, self.scheduler)
+        self.scheduler.start()
+        self.movie.start()
 
     def initUI(self):
         self.setStyleSheet("""
@@ -38,7 +72,7 @@ class RTMApp(QMainWindow):
             QPushButton:hover {
                 background-color: #1565C0;
             }
-            QTableWidget {
+            QTableView {
                 background-color: #1E1E1E;
                 color: white;
                 gridline-color: #333;
@@ -59,40 +93,26 @@ class RTMApp(QMainWindow):
         self.setCentralWidget(self.stack)
         
         self.mainPage = QWidget()
-        self.page1 = QWidget()
-        self.page2 = QWidget()
-        self.page3 = QWidget()
-        self.page4 = QWidget()
-        
-        self.setupPage(self.page1)
-        self.setupPage(self.page2)
-        self.setupPage(self.page3)
-        self.setupPage(self.page4)
-        
         self.stack.addWidget(self.mainPage)
-        self.stack.addWidget(self.page1)
-        self.stack.addWidget(self.page2)
-        self.stack.addWidget(self.page3)
-        self.stack.addWidget(self.page4)
         
         layout = QHBoxLayout()
         
         left_panel = QVBoxLayout()
         
         self.page1_button = QPushButton("Go to Page 1")
-        self.page1_button.clicked.connect(lambda: self.stack.setCurrentWidget(self.page1))
+        self.page1_button.clicked.connect(lambda: self.showPage(1))
         left_panel.addWidget(self.page1_button)
         
         self.page2_button = QPushButton("Go to Page 2")
-        self.page2_button.clicked.connect(lambda: self.stack.setCurrentWidget(self.page2))
+        self.page2_button.clicked.connect(lambda: self.showPage(2))
         left_panel.addWidget(self.page2_button)
         
         self.page3_button = QPushButton("Go to Page 3")
-        self.page3_button.clicked.connect(lambda: self.stack.setCurrentWidget(self.page3))
+        self.page3_button.clicked.connect(lambda: self.showPage(3))
         left_panel.addWidget(self.page3_button)
         
         self.page4_button = QPushButton("Go to Page 4")
-        self.page4_button.clicked.connect(lambda: self.stack.setCurrentWidget(self.page4))
+        self.page4_button.clicked.connect(lambda: self.showPage(4))
         left_panel.addWidget(self.page4_button)
         
         layout.addLayout(left_panel)
@@ -110,18 +130,20 @@ class RTMApp(QMainWindow):
         self.status_filter = QComboBox()
         self.status_filter.addItem("All")
         self.status_filter.addItems(["Available", "AUX", "Break", "Offline", "Unaligned AUX"])
-        self.status_filter.currentIndexChanged.connect(self.loadData)
+        self.status_filter.currentIndexChanged.connect(self.filter_timer.start)
         filter_layout.addWidget(QLabel("Status:"))
         filter_layout.addWidget(self.status_filter)
         
         self.search_box = QLineEdit()
         self.search_box.setPlaceholderText("Search Agent...")
-        self.search_box.textChanged.connect(self.loadData)
+        self.search_box.textChanged.connect(self.filter_timer.start)
         filter_layout.addWidget(self.search_box)
         
         main_content.addLayout(filter_layout)
         
-        self.agent_status_table = QTableWidget()
+        self.agent_model = AgentTableModel(self)
+        self.agent_status_table = AgentTableView()
+        self.agent_status_table.setModel(self.agent_model)
         main_content.addWidget(self.agent_status_table)
         
         self.refresh_button = QPushButton("Refresh Now")
@@ -136,9 +158,17 @@ class RTMApp(QMainWindow):
         self.background_label.setGeometry(0, 0, 900, 600)
         self.movie = QMovie("background.gif")  # Replace with your actual GIF path
         self.background_label.setMovie(self.movie)
-        self.movie.start()
         self.background_label.lower()
     
+    def showPage(self, number):
+        # Pages are built the first time they are opened
+        page = self.pages.get(number)
+        if page is None:
+            page = self.pages[number] = QWidget()
+            self.setupPage(page)
+            self.stack.addWidget(page)
+        self.stack.setCurrentWidget(page)
+
     def setupPage(self, page):
         layout = QVBoxLayout()
         back_button = QPushButton("Back to Menu")
@@ -147,30 +177,35 @@ class RTMApp(QMainWindow):
         page.setLayout(layout)
     
     def loadData(self):
+        if self.scheduler is not None:
+            self.scheduler.trigger()
+
+    # Runs on the loader thread whenever agent_status.csv changes
+    def buildAgentFilter(self, df):
+        required_columns = {"Login ID", "Status", "Duration (min)"}
+        if not required_columns.issubset(df.columns):
+            raise KeyError("Missing required columns in CSV")
+        agent_filter = AgentFilter(df)
+        self.store_saver.offer(agent_filter.store)
+        return agent_filter
+
+    def onSnapshot(self, snapshot):
         try:
-            df = pd.read_csv("agent_status.csv")
-            required_columns = {"Login ID", "Status", "Duration (min)"}
-            if not required_columns.issubset(df.columns):
-                raise KeyError("Missing required columns in CSV")
-            
-            status_filter = self.status_filter.currentText()
-            search_text = self.search_box.text().lower()
-            
-            if status_filter != "All":
-                df = df[df['Status'] == status_filter]
-            
-            if search_text:
-                df = df[df['Agent Name'].str.lower().str.contains(search_text, na=False)]
-            
-            self.agent_status_table.setRowCount(df.shape[0])
-            self.agent_status_table.setColumnCount(df.shape[1])
-            self.agent_status_table.setHorizontalHeaderLabels(df.columns)
-            
-            for row in range(df.shape[0]):
-                for col in range(df.shape[1]):
-                    self.agent_status_table.setItem(row, col, QTableWidgetItem(str(df.iat[row, col])))
+            if "agents" in snapshot.changed:
+                self.agent_filter = snapshot.derived.get("agents")
+                self.applyFilters()
         except Exception as e:
             print(f"Error loading agent status data: {e}")
+
+    def applyFilters(self):
+        if self.agent_filter is None:
+            return
+        agents = self.agent_filter.apply(self.status_filter.currentText(), self.search_box.text().lower())
+        self.agent_model.setRows(agents)
+
+    def onSourceFailed(self, name, e):
+        if name in ("agents", ""):
+            print(f"Error loading agent status data: {e}")
     
 if __name__ == "__main__":
     app = QApplication(sys.argv)
@@ -1,11 +1,18 @@
 import sys
-import os
-import pandas as pd
 import random
-from PyQt5.QtWidgets import QApplication, QMainWindow, QPushButton, QTableWidget, QTableWidgetItem, QVBoxLayout, QWidget, QMessageBox, QComboBox, QLineEdit, QLabel, QHBoxLayout, QFrame
+from PyQt5.QtWidgets import QApplication, QMainWindow, QPushButton, QVBoxLayout, QWidget, QMessageBox, QComboBox, QLineEdit, QLabel, QHBoxLayout, QFrame
 from PyQt5.QtCore import QTimer
-from PyQt5.QtChart import QChart, QChartView, QPieSeries
+from PyQt5.QtChart import QChartView
 from PyQt5.QtGui import QColor
+from agent_filter import AgentFilter
+from agent_table import AgentTableModel, AgentTableView
+from column_cache import ColumnCache
+from sl_aggregator import SLAggregator, rolling_text
+from profiler_panel import install_profiler
+from push_feed import install_feed
+from scheduler import RefreshScheduler
+from snapshot import SnapshotStore
+from status_charts import StatusCharts, status_counts
 
 class RTMApp(QMainWindow):
     def __init__(self):
@@ -14,12 +21,27 @@ class RTMApp(QMainWindow):
         self.setGeometry(100, 100, 1100, 700)
         
         self.accounts = ["101 Account", "Non Voice Account", "SMB Account", "Smiles Account", "Prestige Account"]
+        # The status charts group agents with pandas, so only the SL files
+        # take the stdlib reader
+        self.store = SnapshotStore(cache=ColumnCache(), parent=self, fast=("sl", "dropped"))
+        self.store.derive("agents", "agents", self.buildAgentFilter)
+        self.store.derive("status_counts", "agents", status_counts)
+        self.store.follow("sl", "sl", SLAggregator())
+        self.store.updated.connect(self.onSnapshot)
+        self.store.failed.connect(self.onSourceFailed)
+        self.agent_filter = None
+        self.filter_timer = QTimer(self)
+        self.filter_timer.setSingleShot(True)
+        self.filter_timer.setInterval(250)
+        self.filter_timer.timeout.connect(self.applyFilters)
         self.initUI()
-        self.loadData()
-        
-        self.timer = QTimer(self)
-        self.timer.timeout.connect(self.loadData)
-        self.timer.start(10000)
+        self.charts = StatusCharts(self.status_chart_view, self.occupancy_chart_view, self)
+        self.charts.setAccount(self.account_dropdown.currentText())
+        self.scheduler = RefreshScheduler(self.store, self)
+        self.scheduler.watchWindow(self)
+        self.feed = install_feed(self.store, self.scheduler)
+        self.scheduler.start()
+        self.profiler_overlay = install_profiler(self)
 
     def initUI(self):
         self.setStyleSheet("background-color: #2E3440; color: #D8DEE9;")
@@ -33,6 +55,7 @@ class RTMApp(QMainWindow):
         self.account_dropdown = QComboBox()
         self.account_dropdown.addItems(self.accounts)
         self.account_dropdown.currentIndexChanged.connect(self.updateSLData)
+        self.account_dropdown.currentIndexChanged.connect(self.updateCharts)
         self.account_dropdown.setStyleSheet("padding: 6px; border-radius: 10px; background-color: #4C566A; color: white;")
         filter_layout.addWidget(QLabel("Account:"))
         filter_layout.addWidget(self.account_dropdown)
@@ -40,14 +63,14 @@ class RTMApp(QMainWindow):
         self.status_filter = QComboBox()
         self.status_filter.addItem("All")
         self.status_filter.addItems(["Available", "AUX", "Break", "Offline", "Unaligned AUX"])
-        self.status_filter.currentIndexChanged.connect(self.loadData)
+        self.status_filter.currentIndexChanged.connect(self.filter_timer.start)
         self.status_filter.setStyleSheet("padding: 6px; border-radius: 10px; background-color: #4C566A; color: white;")
         filter_layout.addWidget(QLabel("Status:"))
         filter_layout.addWidget(self.status_filter)
         
         self.search_box = QLineEdit()
         self.search_box.setPlaceholderText("Search Agent...")
-        self.search_box.textChanged.connect(self.loadData)
+        self.search_box.textChanged.connect(self.filter_timer.start)
         self.search_box.setStyleSheet("padding: 6px; border-radius: 10px; background-color: #4C566A; color: white;")
         filter_layout.addWidget(self.search_box)
         
@@ -61,7 +84,9 @@ class RTMApp(QMainWindow):
         self.interval_label.setStyleSheet("font-weight: bold; font-size: 16px; color: #BF616A;")
         left_panel.addWidget(self.interval_label)
         
-        self.table = QTableWidget()
+        self.agent_model = AgentTableModel(self)
+        self.table = AgentTableView()
+        self.table.setModel(self.agent_model)
         self.table.setStyleSheet("border-radius: 10px; background-color: #3B4252; color: white; padding: 5px;")
         left_panel.addWidget(self.table)
         
@@ -79,9 +104,9 @@ class RTMApp(QMainWindow):
         self.occupancy_chart_view.setStyleSheet("border-radius: 15px; background-color: #434C5E; padding: 10px;")
         right_panel.addWidget(self.occupancy_chart_view)
         
-        self.utilization_chart_view = QChartView()
-        self.utilization_chart_view.setStyleSheet("border-radius: 15px; background-color: #434C5E; padding: 10px;")
-        right_panel.addWidget(self.utilization_chart_view)
+        self.status_chart_view = QChartView()
+        self.status_chart_view.setStyleSheet("border-radius: 15px; background-color: #434C5E; padding: 10px;")
+        right_panel.addWidget(self.status_chart_view)
         
         layout.addLayout(right_panel)
         
@@ -91,60 +116,68 @@ class RTMApp(QMainWindow):
         self.setCentralWidget(container)
 
     def loadData(self):
+        self.scheduler.trigger()
+
+    # Runs on the loader thread whenever agent_status.csv changes
+    def buildAgentFilter(self, df):
+        if df.empty:
+            raise ValueError("CSV file is empty.")
+        return AgentFilter(df)
+
+    def onSnapshot(self, snapshot):
         try:
-            file_path = "agent_status.csv"
-            if not os.path.exists(file_path):
-                raise FileNotFoundError(f"CSV file not found: {file_path}")
-            
-            df = pd.read_csv(file_path)
-            if df.empty:
-                raise ValueError("CSV file is empty.")
-            
-            selected_status = self.status_filter.currentText()
-            if selected_status != "All":
-                df = df[df["Status"] == selected_status]
-            
-            search_text = self.search_box.text().strip().lower()
-            if search_text:
-                df = df[df["Agent Name"].str.lower().str.contains(search_text, na=False)]
-            
-            self.table.setRowCount(df.shape[0])
-            self.table.setColumnCount(df.shape[1])
-            self.table.setHorizontalHeaderLabels(df.columns)
-            
-            for row in range(df.shape[0]):
-                for col in range(df.shape[1]):
-                    self.table.setItem(row, col, QTableWidgetItem(str(df.iat[row, col])))
-            
-            self.updateSLData()
-            self.updateCharts(df)
+            if "agents" in snapshot.changed:
+                self.agent_filter = snapshot.derived.get("agents")
+                self.applyFilters()
+            if "status_counts" in snapshot.changed:
+                self.charts.addSample(snapshot.derived["status_counts"])
+            if "sl" in snapshot.changed:
+                self.updateSLData()
         except Exception as e:
             QMessageBox.critical(self, "Error", f"Error loading data: {e}")
             print(f"Error loading data: {e}")
+
+    def applyFilters(self):
+        if self.agent_filter is None:
+            return
+        selected_status = self.status_filter.currentText()
+        search_text = self.search_box.text().strip().lower()
+        agents = self.agent_filter.apply(selected_status, search_text)
+        self.agent_model.setRows(agents)
+
+    def onSourceFailed(self, name, e):
+        if name in ("agents", ""):
+            QMessageBox.critical(self, "Error", f"Error loading data: {e}")
+            print(f"Error loading data: {e}")
+        elif name == "sl":
+            QMessageBox.critical(self, "Error", f"Error fetching SL data: {e}")
+            print(f"Error fetching SL data: {e}")
+        elif name == "status_counts":
+            print(f"Error updating status charts: {e}")
     
     def updateSLData(self):
-        selected_account = self.account_dropdown.currentText()
-        
         try:
-            df = pd.read_csv("sl_data.csv")
-            df = df[df["Account"] == selected_account]
-            
-            if df.empty:
+            snapshot = self.store.snapshot
+            summary = snapshot.derived.get("sl") if snapshot else None
+            if summary is None:
+                return
+            selected_account = self.account_dropdown.currentText()
+        
+            account_sl = summary.get(selected_account)
+            if account_sl is None or account_sl.latest_sl is None:
                 self.sl_label.setText("No SL data available.")
                 self.interval_label.setText("No dropped intervals.")
                 return
-            
-            latest_sl = df.iloc[-1]["Service Level"]
-            dropped_intervals = df["Dropped Intervals"].sum()
-            
-            self.sl_label.setText(f"Service Level for {selected_account}: {latest_sl:.2f}%")
-            self.interval_label.setText(f"Dropped Intervals: {dropped_intervals}")
+        
+            self.sl_label.setText(f"Service Level for {selected_account}: {account_sl.latest_sl:.2f}%")
+            self.sl_label.setToolTip(rolling_text(account_sl))
+            self.interval_label.setText(f"Dropped Intervals: {account_sl.dropped_total}")
         except Exception as e:
             QMessageBox.critical(self, "Error", f"Error fetching SL data: {e}")
             print(f"Error fetching SL data: {e}")
     
-    def updateCharts(self, df):
-        print("Charts updated with new data")
+    def updateCharts(self):
+        self.charts.setAccount(self.account_dropdown.currentText())
 
 if __name__ == "__main__":
     app = QApplication(sys.argv)
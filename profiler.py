@@ -0,0 +1,103 @@
+import json
+import os
+import threading
+import time
+from collections import deque, namedtuple
+from contextlib import contextmanager
+
+Span = namedtuple("Span", ["name", "detail", "start", "duration", "rows", "tick", "thread"])
+
+STAGES = ("stat", "parse", "derive", "filter", "model", "paint", "refresh")
+
+
+class Profiler:
+    def __init__(self, capacity=5000):
+        self._spans = deque(maxlen=capacity)
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.enabled = True
+        self.last_tick = None
+        # Startup figures such as time-to-first-frame are measured from here
+        self.started = time.perf_counter()
+
+    @contextmanager
+    def tick(self, tick):
+        # Spans recorded on this thread inside the block belong to `tick`
+        previous = getattr(self._local, "tick", None)
+        self._local.tick = tick
+        try:
+            yield
+        finally:
+            self._local.tick = previous
+
+    @contextmanager
+    def span(self, name, detail=None, rows=None):
+        # The caller may fill in info["rows"] once the work is done
+        info = {"rows": rows}
+        start = time.perf_counter()
+        try:
+            yield info
+        finally:
+            self.record(name, start, time.perf_counter() - start, detail, info["rows"])
+
+    def record(self, name, start, duration, detail=None, rows=None, tick=None):
+        if not self.enabled:
+            return
+        if tick is None:
+            tick = getattr(self._local, "tick", None)
+            if tick is None:
+                tick = self.last_tick
+        span = Span(name, detail, start, duration, rows, tick, threading.get_ident())
+        with self._lock:
+            self._spans.append(span)
+
+    def spans(self):
+        with self._lock:
+            return list(self._spans)
+
+    def last(self, name):
+        for span in reversed(self.spans()):
+            if span.name == name:
+                return span
+        return None
+
+    def refreshes(self, count=10):
+        # {tick: {stage: total ms}} for the most recent ticks
+        ticks = {}
+        for span in self.spans():
+            if span.tick is None:
+                continue
+            stages = ticks.setdefault(span.tick, {})
+            stages[span.name] = stages.get(span.name, 0.0) + span.duration * 1000
+        return {tick: ticks[tick] for tick in sorted(ticks)[-count:]}
+
+    def exportJsonLines(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            for span in self.spans():
+                f.write(json.dumps(span._asdict()) + "\n")
+
+    def exportChromeTrace(self, path):
+        # Load in chrome://tracing or https://ui.perfetto.dev
+        events = []
+        for span in self.spans():
+            events.append({
+                "name": span.name if span.detail is None else f"{span.name} {span.detail}",
+                "cat": span.name,
+                "ph": "X",
+                "ts": span.start * 1e6,
+                "dur": span.duration * 1e6,
+                "pid": os.getpid(),
+                "tid": span.thread,
+                "args": {"rows": span.rows, "tick": span.tick},
+            })
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+
+    def export(self, path):
+        if path.endswith(".json"):
+            self.exportChromeTrace(path)
+        else:
+            self.exportJsonLines(path)
+
+
+profiler = Profiler()
@@ -0,0 +1,81 @@
+import os
+import time
+from PyQt5.QtCore import QEvent, QObject, Qt, QTimer
+from PyQt5.QtGui import QKeySequence
+from PyQt5.QtWidgets import QApplication, QLabel, QShortcut
+from profiler import STAGES, profiler
+
+OVERLAY_ROWS = 10
+
+
+class ProfilerOverlay(QLabel):
+    def __init__(self, parent, budget_ms=10000):
+        super().__init__(parent)
+        self.budget_ms = budget_ms
+        self.setAttribute(Qt.WA_TransparentForMouseEvents)
+        self.setTextFormat(Qt.RichText)
+        self.setStyleSheet("background-color: rgba(0, 0, 0, 190); color: #E0E0E0; font-family: monospace; font-size: 11px; padding: 6px;")
+        self.hide()
+        self._timer = QTimer(self)
+        self._timer.setInterval(1000)
+        self._timer.timeout.connect(self.updateText)
+
+    def toggle(self):
+        if self.isVisible():
+            self._timer.stop()
+            self.hide()
+            return
+        self.updateText()
+        self._timer.start()
+        self.show()
+        self.raise_()
+
+    def updateText(self):
+        header = "tick " + "".join(f"{stage:>9}" for stage in STAGES)
+        lines = [header]
+        for tick, stages in profiler.refreshes(OVERLAY_ROWS).items():
+            line = f"{tick:>4} " + "".join(f"{stages.get(stage, 0.0):>9.1f}" for stage in STAGES)
+            if stages.get("refresh", 0.0) > self.budget_ms:
+                line = f"<span style='color: #FF5252'>{line}</span>"
+            lines.append(line)
+        first_frame = profiler.last("first_frame")
+        if first_frame is not None:
+            lines.append(f"first frame {first_frame.duration * 1000:.0f} ms after start")
+        self.setText("<pre>" + "<br>".join(lines) + "<br>(ms per refresh, F12 to hide)</pre>")
+        self.adjustSize()
+        parent = self.parentWidget()
+        self.move(parent.width() - self.width() - 10, 10)
+
+
+class _FirstFrame(QObject):
+    def __init__(self, window, callback=None):
+        super().__init__(window)
+        self.callback = callback
+        window.installEventFilter(self)
+
+    def eventFilter(self, obj, event):
+        if event.type() == QEvent.Paint:
+            obj.removeEventFilter(self)
+            # Let the rest of the first frame paint before the callback
+            QTimer.singleShot(0, self._painted)
+        return False
+
+    def _painted(self):
+        profiler.record("first_frame", profiler.started, time.perf_counter() - profiler.started)
+        if self.callback is not None:
+            self.callback()
+
+
+def install_profiler(window, budget_ms=10000, on_first_frame=None):
+    # F12 toggles the overlay; RTM_PROFILE=<file>.json writes a Chrome trace
+    # on exit, any other file name gets JSON lines. Time-to-first-frame is
+    # recorded, then on_first_frame runs: slow startup work belongs there
+    # rather than in __init__.
+    overlay = ProfilerOverlay(window, budget_ms)
+    overlay.first_frame = _FirstFrame(window, on_first_frame)
+    shortcut = QShortcut(QKeySequence(Qt.Key_F12), window)
+    shortcut.activated.connect(overlay.toggle)
+    path = os.environ.get("RTM_PROFILE")
+    if path:
+        QApplication.instance().aboutToQuit.connect(lambda: profiler.export(path))
+    return overlay
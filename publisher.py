@@ -0,0 +1,56 @@
+import argparse
+import csv
+import json
+import random
+import socket
+import time
+from push_feed import parse_address
+
+STATUSES = ["Available", "AUX", "Break", "Offline", "Unaligned AUX"]
+
+
+def read_agents(path):
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        return list(csv.DictReader(f))
+
+
+def connect(address):
+    kind, target = parse_address(address)
+    family = socket.AF_UNIX if kind == "unix" else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.connect(target)
+    return sock
+
+
+def main():
+    # Stand-in for the ACD event stream: sends every row of the CSV as a
+    # status event, then keeps changing random agents' status
+    parser = argparse.ArgumentParser(description="Replay agent_status.csv into an RTM push feed")
+    parser.add_argument("address", help="unix:/path/to.sock or tcp:host:port, as given in RTM_FEED")
+    parser.add_argument("--csv", default="agent_status.csv")
+    parser.add_argument("--rate", type=float, default=5.0, help="status changes per second after the replay")
+    parser.add_argument("--count", type=int, default=0, help="stop after this many changes (0 runs until interrupted)")
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    agents = read_agents(args.csv)
+    sock = connect(args.address)
+    with sock, sock.makefile("w", encoding="utf-8", newline="\n") as out:
+        for row in agents:
+            out.write(json.dumps(row) + "\n")
+        out.flush()
+        print(f"Replayed {len(agents)} agents")
+
+        sent = 0
+        while agents and (not args.count or sent < args.count):
+            time.sleep(1 / args.rate)
+            row = rng.choice(agents)
+            event = {"Login ID": row["Login ID"], "Status": rng.choice(STATUSES), "Duration (min)": 0}
+            out.write(json.dumps(event) + "\n")
+            out.flush()
+            sent += 1
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,259 @@
+import asyncio
+import json
+import os
+import sys
+import threading
+import time
+import numpy as np
+from PyQt5.QtCore import QObject, pyqtSignal
+from PyQt5.QtWidgets import QApplication
+from agent_store import DURATION_COLUMN, SINCE_COLUMN
+from data_source import CsvSource
+from profiler import profiler
+
+KEY_COLUMN = "Login ID"
+STATUS_COLUMN = "Status"
+RECEIVED = "_received"
+
+
+def parse_address(address):
+    # "unix:/path/to.sock" or "tcp:host:port" (a bare "host:port" means tcp)
+    kind, _, rest = address.partition(":")
+    if kind == "unix":
+        return "unix", rest
+    if kind != "tcp":
+        rest = address
+    host, _, port = rest.rpartition(":")
+    return "tcp", (host or "127.0.0.1", int(port))
+
+
+class PushFeed(QObject):
+    # Emitted from the listener thread, so slots run queued on the GUI thread
+    received = pyqtSignal()
+
+    def __init__(self, address, parent=None):
+        super().__init__(parent)
+        self.kind, self.address = parse_address(address)
+        self.bad_lines = 0
+        self._lock = threading.Lock()
+        # Login ID -> merged fields; repeated events for one agent collapse
+        # into one delta, so a stalled consumer holds at most one per agent
+        self._pending = {}
+        self._notified = False
+        self._loop = None
+        self._server = None
+        self._error = None
+        self._thread = None
+        # Connection handler task -> its writer; closing the writers on
+        # shutdown ends each handler before the server waits for its clients
+        self._clients = {}
+
+    def start(self):
+        self._loop = asyncio.new_event_loop()
+        ready = threading.Event()
+        self._thread = threading.Thread(target=self._run, args=(ready,), name="rtm-feed", daemon=True)
+        self._thread.start()
+        ready.wait()
+        if self._server is None:
+            self._loop = None
+            raise self._error or OSError(f"could not listen on {self.address}")
+
+    def close(self):
+        if self._loop is None:
+            return
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(2)
+        self._loop = None
+        if self.kind == "unix" and os.path.exists(self.address):
+            os.unlink(self.address)
+
+    def take(self):
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            self._notified = False
+        return pending
+
+    def _run(self, ready):
+        asyncio.set_event_loop(self._loop)
+        try:
+            if self.kind == "unix":
+                if os.path.exists(self.address):
+                    os.unlink(self.address)
+                server = asyncio.start_unix_server(self._handle, path=self.address)
+            else:
+                server = asyncio.start_server(self._handle, *self.address)
+            self._server = self._loop.run_until_complete(server)
+        except OSError as e:
+            self._error = e
+            self._loop.close()
+            return
+        finally:
+            ready.set()
+        self._loop.run_forever()
+        self._server.close()
+        for writer in self._clients.values():
+            writer.close()
+        self._loop.run_until_complete(asyncio.gather(*self._clients, return_exceptions=True))
+        self._loop.run_until_complete(self._server.wait_closed())
+        self._loop.close()
+
+    async def _handle(self, reader, writer):
+        task = asyncio.current_task()
+        self._clients[task] = writer
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                if self._queue(line):
+                    self.received.emit()
+        except ConnectionError:
+            pass
+        finally:
+            self._clients.pop(task, None)
+            writer.close()
+
+    def _queue(self, line):
+        # True when the GUI needs waking; while an earlier wake-up is still
+        # unanswered, a burst of events only adds to the pending deltas
+        try:
+            event = json.loads(line)
+            key = str(event.pop(KEY_COLUMN))
+            event[RECEIVED] = time.monotonic()
+        except (ValueError, KeyError, TypeError, AttributeError):
+            self.bad_lines += 1
+            return False
+        with self._lock:
+            if event.get("removed"):
+                self._pending[key] = {"removed": True}
+            else:
+                merged = self._pending.get(key)
+                if merged is None or merged.get("removed"):
+                    self._pending[key] = event
+                else:
+                    merged.update(event)
+            notify = not self._notified
+            self._notified = True
+        return notify
+
+
+def _since(received, minutes):
+    # Status-change time on the monotonic clock for an event that reports
+    # how long the agent has been in its status
+    try:
+        return received - float(minutes) * 60
+    except (TypeError, ValueError):
+        return received
+
+
+def _coerce(frame, column, values):
+    # JSON numbers may arrive as strings; keep numeric columns numeric
+    import pandas as pd
+    if not pd.api.types.is_numeric_dtype(frame[column]):
+        return values
+    values = pd.to_numeric(values, errors="coerce")
+    if values.isna().any() and pd.api.types.is_integer_dtype(frame[column]):
+        frame[column] = frame[column].astype(float)
+    return values
+
+
+class PushSource:
+    # Same interface as CsvSource; the CSV is read once as the baseline and
+    # from then on the feed's deltas are applied to the in-memory table
+    def __init__(self, path, feed):
+        self.path = path
+        self.feed = feed
+        self.frame = None
+        self.version = 0
+        self.appended = None
+        self.reloads = 0
+        self._baseline = CsvSource(path, tail=False)
+        self._rows = {}
+
+    def poll(self):
+        # pandas only loads once a feed is configured
+        import pandas as pd
+        if self.frame is None:
+            self._baseline.poll()
+            frame = self._baseline.frame.copy()
+            # Pin every agent's status-change time now; rows rebuilt from
+            # deltas no longer carry the file's mtime
+            exported = time.monotonic() - max(0.0, time.time() - frame.attrs["mtime"])
+            if DURATION_COLUMN in frame.columns:
+                frame[SINCE_COLUMN] = exported - pd.to_numeric(frame[DURATION_COLUMN], errors="coerce").to_numpy(dtype=np.float64) * 60
+            else:
+                frame[SINCE_COLUMN] = np.nan
+            self._setFrame(frame)
+            self._baseline = None
+            self.version += 1
+            return True
+        deltas = self.feed.take()
+        if not deltas:
+            return False
+        with profiler.span("parse", "push", rows=len(deltas)):
+            self._apply(deltas)
+        self.version += 1
+        return True
+
+    def _setFrame(self, frame):
+        self.frame = frame.reset_index(drop=True)
+        self._rows = {str(key): i for i, key in enumerate(self.frame[KEY_COLUMN])}
+        self.appended = None
+        self.reloads += 1
+
+    def _apply(self, deltas):
+        import pandas as pd
+        # Snapshots already handed out keep the old frame, so edit a copy
+        frame = self.frame.copy()
+        removed, added = [], []
+        updates = {}
+        status = frame.columns.get_loc(STATUS_COLUMN) if STATUS_COLUMN in frame.columns else None
+        for key, fields in deltas.items():
+            row = self._rows.get(key)
+            if fields.get("removed"):
+                if row is not None:
+                    removed.append(row)
+                continue
+            received = fields.pop(RECEIVED)
+            if DURATION_COLUMN in fields:
+                fields[SINCE_COLUMN] = _since(received, fields[DURATION_COLUMN])
+            elif row is None or (status is not None and STATUS_COLUMN in fields and fields[STATUS_COLUMN] != frame.iat[row, status]):
+                fields[SINCE_COLUMN] = received
+            if row is None:
+                added.append({KEY_COLUMN: key, **fields})
+            else:
+                for column, value in fields.items():
+                    if column in frame.columns:
+                        positions, values = updates.setdefault(column, ([], []))
+                        positions.append(row)
+                        values.append(value)
+        for column, (positions, values) in updates.items():
+            values = _coerce(frame, column, pd.Series(values, dtype=object))
+            frame.iloc[positions, frame.columns.get_loc(column)] = values.to_numpy()
+        if removed:
+            frame = frame.drop(index=removed)
+        if added:
+            added = pd.DataFrame(added, columns=frame.columns)
+            for column in frame.columns:
+                added[column] = _coerce(frame, column, added[column])
+            frame = pd.concat([frame, added], ignore_index=True)
+        self._setFrame(frame)
+
+
+def install_feed(store, scheduler):
+    # RTM_FEED=unix:/tmp/rtm.sock or tcp:127.0.0.1:8765 takes agent status
+    # from pushed events instead of polling agent_status.csv
+    address = os.environ.get("RTM_FEED")
+    if not address:
+        return None
+    feed = PushFeed(address, store)
+    try:
+        feed.start()
+    except OSError as e:
+        # The dashboard still works from the CSV, just not in real time
+        print(f"Error starting push feed on {address}: {e}; polling agent_status.csv instead", file=sys.stderr)
+        return None
+    store.setSource("agents", PushSource(store.path("agents"), feed))
+    scheduler.watchFeed(feed)
+    QApplication.instance().aboutToQuit.connect(feed.close)
+    return feed
@@ -0,0 +1,203 @@
+import heapq
+from collections import namedtuple
+import numpy as np
+import pandas as pd
+from PyQt5.QtWidgets import QComboBox, QHBoxLayout, QLabel, QTableWidget, QTableWidgetItem, QVBoxLayout, QWidget
+
+RISK_LEVELS = ("Low", "Medium", "High")
+LOW, MEDIUM, HIGH = range(3)
+TOP_K = 10
+
+# Chosen so the rules reproduce every Risk Level in the sample
+# risky_intervals.csv (it has a Medium at 88% SL with 8 dropped)
+HIGH_SL, MEDIUM_SL = 75.0, 85.0
+HIGH_DROPPED, MEDIUM_DROPPED = 15, 8
+DROPPED_WEIGHT = 0.5
+
+# Column names per source, first match wins
+RISK_COLUMNS = {
+    "risky": {"interval": ("Time Interval", "Interval"), "sl": ("Service Level", "SL %"), "dropped": ("Dropped Calls",), "level": ("Risk Level",)},
+    "sl": {"interval": ("Interval",), "sl": ("SL %", "Service Level"), "dropped": (), "level": ()},
+}
+
+RiskyInterval = namedtuple("RiskyInterval", ["account", "day", "interval", "service_level", "dropped", "level", "score", "source"])
+# worst: {account: [RiskyInterval, worst first]}, levels: {account: (low, medium, high)}
+RiskSummary = namedtuple("RiskSummary", ["worst", "levels"])
+
+
+def classify(sl, dropped, reported=None):
+    # Vectorized rules; NaN SL never trips an SL rule
+    level = np.select([(sl < HIGH_SL) | (dropped >= HIGH_DROPPED), (sl < MEDIUM_SL) | (dropped >= MEDIUM_DROPPED)], [HIGH, MEDIUM], LOW)
+    if reported is not None:
+        level = np.maximum(level, reported)
+    score = np.clip(np.nan_to_num(100 - sl, nan=0.0), 0, None) + DROPPED_WEIGHT * np.nan_to_num(dropped)
+    return level.astype(np.int8), score
+
+
+def _starts(intervals):
+    # "10:15-10:30" -> 615, NaN when unparsable
+    parts = intervals.astype(str).str.extract(r"^\s*(\d{1,2}):(\d{2})").astype(float)
+    return (parts[0] * 60 + parts[1]).to_numpy()
+
+
+def _column(df, names):
+    return next((c for c in names if c in df.columns), None)
+
+
+class _AccountRisk:
+    def __init__(self):
+        self.heap = []
+        self.levels = np.zeros(3, dtype=np.int64)
+        self.day = 0
+        self.last_start = np.nan
+
+
+class _Track:
+    # Follow state for one source file
+    def __init__(self, reloads):
+        self.reloads = reloads
+        self.rows = 0
+        self.accounts = {}
+
+
+class RiskEngine:
+    def __init__(self, kinds=("risky", "sl"), k=TOP_K):
+        self.kinds = kinds
+        self.k = k
+        self._tracks = {}
+        self._seq = 0
+        self._summary = RiskSummary({}, {})
+
+    # Called on the loader thread with one source per kind. Only appended
+    # rows are classified; a source that reloads drops just its own results.
+    def update(self, *sources):
+        touched = set()
+        for kind, source in zip(self.kinds, sources):
+            track = self._tracks.get(kind)
+            df = source.frame
+            if track is None or source.reloads != track.reloads or len(df) < track.rows:
+                if track is not None:
+                    touched.update(track.accounts)
+                track = self._tracks[kind] = _Track(source.reloads)
+            if "Account" in df.columns and len(df) > track.rows:
+                touched.update(self._classify(kind, track, df.iloc[track.rows:]))
+            track.rows = len(df)
+        if not touched:
+            return self._summary
+
+        # Publish fresh dicts so snapshots already handed to the GUI never change
+        worst = dict(self._summary.worst)
+        levels = dict(self._summary.levels)
+        for account in touched:
+            states = [t.accounts[account] for t in self._tracks.values() if account in t.accounts]
+            if not states:
+                worst.pop(account, None)
+                levels.pop(account, None)
+                continue
+            entries = heapq.nlargest(self.k, (entry for state in states for entry in state.heap))
+            worst[account] = [entry[-1] for entry in entries]
+            levels[account] = tuple(int(n) for n in sum(state.levels for state in states))
+        self._summary = RiskSummary(worst, levels)
+        return self._summary
+
+    def _classify(self, kind, track, new):
+        if not isinstance(new, pd.DataFrame):
+            new = new.to_pandas()  # sl_data.csv comes from the stdlib reader
+        columns = RISK_COLUMNS[kind]
+        count = len(new)
+        sl_column = _column(new, columns["sl"])
+        dropped_column = _column(new, columns["dropped"])
+        level_column = _column(new, columns["level"])
+        interval_column = _column(new, columns["interval"])
+        sl = pd.to_numeric(new[sl_column], errors="coerce").to_numpy(dtype=float) if sl_column else np.full(count, np.nan)
+        dropped = pd.to_numeric(new[dropped_column], errors="coerce").to_numpy(dtype=float) if dropped_column else np.zeros(count)
+        reported = None
+        if level_column:
+            reported = new[level_column].map({name: i for i, name in enumerate(RISK_LEVELS)}).fillna(LOW).to_numpy(dtype=np.int8)
+        level, score = classify(sl, dropped, reported)
+        intervals = new[interval_column].astype(str).to_numpy() if interval_column else np.full(count, "", dtype=object)
+        starts = _starts(new[interval_column]) if interval_column else np.full(count, np.nan)
+
+        codes, accounts = pd.factorize(new["Account"])
+        order = np.argsort(codes, kind="stable")
+        bounds = np.flatnonzero(np.diff(codes[order])) + 1
+        for positions in np.split(order, bounds):
+            if not len(positions) or codes[positions[0]] < 0:
+                continue
+            account = accounts[codes[positions[0]]]
+            state = track.accounts.get(account)
+            if state is None:
+                state = track.accounts[account] = _AccountRisk()
+            # Intervals only carry a time of day; going backwards means a new day
+            account_starts = starts[positions]
+            back = np.diff(np.concatenate(([state.last_start], account_starts))) < 0
+            days = state.day + np.cumsum(back)
+            known = np.flatnonzero(~np.isnan(account_starts))
+            if len(known):
+                state.last_start = account_starts[known[-1]]
+            state.day = int(days[-1])
+            state.levels += np.bincount(level[positions], minlength=3)
+
+            # Only this chunk's own worst k can make it into the heap
+            risky = positions[level[positions] >= MEDIUM]
+            candidates = risky[np.lexsort((score[risky], level[risky]))[-self.k:]]
+            candidate_days = days[np.searchsorted(positions, candidates)]
+            for i, day in zip(candidates.tolist(), candidate_days.tolist()):
+                self._seq += 1
+                item = RiskyInterval(account, int(day), intervals[i], float(sl[i]), float(dropped[i]), RISK_LEVELS[level[i]], float(score[i]), kind)
+                entry = (int(level[i]), float(score[i]), self._seq, item)
+                if len(state.heap) < self.k:
+                    heapq.heappush(state.heap, entry)
+                elif entry > state.heap[0]:
+                    heapq.heapreplace(state.heap, entry)
+        return set(accounts)
+
+
+class RiskPanel(QWidget):
+    def __init__(self, accounts, parent=None):
+        super().__init__(parent)
+        self._summary = None
+        layout = QVBoxLayout(self)
+        top = QHBoxLayout()
+        self.account_dropdown = QComboBox()
+        self.account_dropdown.addItem("All Accounts")
+        self.account_dropdown.addItems(accounts)
+        self.account_dropdown.currentIndexChanged.connect(self.updateTable)
+        top.addWidget(QLabel("Account:"))
+        top.addWidget(self.account_dropdown)
+        self.levels_label = QLabel()
+        top.addWidget(self.levels_label)
+        top.addStretch()
+        layout.addLayout(top)
+        self.table = QTableWidget(0, 7)
+        self.table.setHorizontalHeaderLabels(["Account", "Day", "Interval", "Service Level", "Dropped", "Risk Level", "Source"])
+        self.table.setEditTriggers(QTableWidget.NoEditTriggers)
+        layout.addWidget(self.table)
+
+    def setSummary(self, summary):
+        if summary is self._summary:
+            return
+        self._summary = summary
+        self.updateTable()
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.updateTable()
+
+    def updateTable(self):
+        if self._summary is None or not self.isVisible():
+            return
+        account = self.account_dropdown.currentText()
+        if self.account_dropdown.currentIndex() > 0:
+            rows = self._summary.worst.get(account, [])
+            levels = self._summary.levels.get(account, (0, 0, 0))
+        else:
+            rows = heapq.nlargest(TOP_K, (r for items in self._summary.worst.values() for r in items),
+                                  key=lambda r: (RISK_LEVELS.index(r.level), r.score))
+            levels = [sum(counts) for counts in zip((0, 0, 0), *self._summary.levels.values())]
+        self.levels_label.setText("  ".join(f"{name}: {n}" for name, n in zip(RISK_LEVELS, levels)))
+        self.table.setRowCount(len(rows))
+        for i, item in enumerate(rows):
+            values = (item.account, item.day, item.interval, f"{item.service_level:.1f}", f"{item.dropped:g}", item.level, item.source)
+            for j, value in enumerate(values):
+                self.table.setItem(i, j, QTableWidgetItem(str(value)))
@@ -0,0 +1,40 @@
+from collections import namedtuple
+import numpy as np
+
+# Past this many removed plus inserted blocks a model reset is cheaper than
+# replaying them one by one through the view
+MAX_BLOCKS = 32
+
+# removed: (first, last) blocks in old positions; inserted: (first, last)
+# blocks in new positions; updated: new positions of kept rows whose
+# signature changed; kept_old/kept_new: positions of the kept rows, aligned
+RowDiff = namedtuple("RowDiff", ["removed", "inserted", "updated", "kept_old", "kept_new"])
+
+
+def runs(rows):
+    # Collapse sorted row positions into (first, last) ranges
+    if len(rows) == 0:
+        return []
+    breaks = np.flatnonzero(np.diff(rows) != 1)
+    starts = np.concatenate(([rows[0]], rows[breaks + 1]))
+    stops = np.concatenate((rows[breaks], [rows[-1]]))
+    return list(zip(starts.tolist(), stops.tolist()))
+
+
+def diff_rows(old_keys, old_signatures, new_keys, new_signatures):
+    # Keyed diff of two row sequences. Returns None when the rows can't be
+    # patched in place (duplicate keys, reordered rows, too much churn).
+    if len(np.unique(old_keys)) != len(old_keys) or len(np.unique(new_keys)) != len(new_keys):
+        return None
+    kept = np.isin(old_keys, new_keys)
+    common = np.isin(new_keys, old_keys)
+    if not np.array_equal(old_keys[kept], new_keys[common]):
+        return None
+    removed = runs(np.flatnonzero(~kept))
+    inserted = runs(np.flatnonzero(~common))
+    if len(removed) + len(inserted) > MAX_BLOCKS:
+        return None
+    kept_old = np.flatnonzero(kept)
+    kept_new = np.flatnonzero(common)
+    updated = kept_new[old_signatures[kept_old] != new_signatures[kept_new]]
+    return RowDiff(removed, inserted, updated, kept_old, kept_new)
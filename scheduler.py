@@ -0,0 +1,105 @@
+import time
+from PyQt5.QtCore import QEvent, QObject, QTimer
+
+
+class RefreshScheduler(QObject):
+    # Drives SnapshotStore.refresh: backs off while sources are unchanged,
+    # speeds up while they keep changing, pauses while nobody is looking and
+    # folds overlapping triggers into one refresh.
+    def __init__(self, store, parent=None, interval=10000, min_interval=2000, max_interval=60000):
+        super().__init__(parent)
+        self.store = store
+        self.interval = interval
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self._in_flight = False
+        self._pending = False
+        self._paused = set()
+        self.background_interval = None
+        self._last_refresh = None
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.timeout.connect(self.trigger)
+        store.updated.connect(self._onUpdated)
+        store.failed.connect(self._onFailed)
+
+    def start(self):
+        self.trigger()
+
+    def trigger(self):
+        if self._in_flight:
+            self._pending = True
+            return
+        self._timer.stop()
+        self._in_flight = True
+        self._pending = False
+        self._last_refresh = time.monotonic()
+        self.store.refresh()
+
+    def setPaused(self, reason, paused):
+        if paused:
+            self._paused.add(reason)
+            self._timer.stop()
+            if self.background_interval is not None and not self._in_flight:
+                self._schedule()
+            return
+        self._paused.discard(reason)
+        if not self._paused and not self._in_flight:
+            self._schedule()
+
+    def setBackgroundInterval(self, interval):
+        # Keep polling this slowly while paused, for consumers such as
+        # alerts that matter when nobody is looking; None stops entirely
+        self.background_interval = interval
+        if self._paused and not self._in_flight:
+            self._timer.stop()
+            if interval is not None:
+                self._schedule()
+
+    def watchWindow(self, window):
+        window.installEventFilter(self)
+
+    def watchStack(self, stack, live_pages):
+        # Pages outside live_pages don't show store data, so don't poll for them
+        def pageChanged(_):
+            self.setPaused("page", stack.currentWidget() not in live_pages)
+        stack.currentChanged.connect(pageChanged)
+
+    def watchFeed(self, feed):
+        # Pushed events refresh straight away; coalescing absorbs bursts
+        feed.received.connect(self._onPushed)
+
+    def eventFilter(self, obj, event):
+        kind = event.type()
+        if kind in (QEvent.WindowStateChange, QEvent.Hide, QEvent.Show):
+            self.setPaused("window", obj.isMinimized() or not obj.isVisible())
+        return False
+
+    def _onUpdated(self, snapshot):
+        if snapshot.changed:
+            self.interval = max(self.min_interval, self.interval // 2)
+        else:
+            self.interval = min(self.max_interval, int(self.interval * 1.5))
+        self._finish()
+
+    def _onPushed(self):
+        if not self._paused:
+            self.trigger()
+
+    def _onFailed(self, name, e):
+        # An empty name means the whole load failed and no update follows
+        if not name:
+            self._finish()
+
+    def _finish(self):
+        self._in_flight = False
+        if self._pending:
+            self.trigger()
+        elif not self._paused or self.background_interval is not None:
+            self._schedule()
+
+    def _schedule(self):
+        # After a pause, refresh straight away if the data is already overdue
+        interval = self.interval if not self._paused else max(self.interval, self.background_interval)
+        elapsed = 0 if self._last_refresh is None else (time.monotonic() - self._last_refresh) * 1000
+        self._timer.start(max(0, int(interval - elapsed)))
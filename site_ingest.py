@@ -0,0 +1,190 @@
+import glob
+import multiprocessing
+import os
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import numpy as np
+
+# RTM_SITES lists every site's agent_status.csv export, separated like PATH;
+# glob patterns are expanded on each tick so new sites are picked up. An
+# export without an Account column is one account's: write the entry as
+# ACCOUNT=PATTERN, or name the account in a folder or the file name.
+SITES_VARIABLE = "RTM_SITES"
+
+# What a worker sends back for one file: agents per account, (account,
+# status) counts and each agent's status-change time (wall clock, sorted
+# within its account) - a few small arrays instead of a pickled frame
+SiteSummary = namedtuple("SiteSummary", ["stat", "statuses", "agents", "counts", "since", "bounds"])
+# Every site folded together: statuses are the union of labels, counts is
+# accounts x statuses and since[bounds[i]:bounds[i + 1]] is account i
+SiteTotals = namedtuple("SiteTotals", ["sites", "statuses", "agents", "counts", "since", "bounds", "errors"])
+
+
+def _folded(text):
+    return "".join(c for c in text.casefold() if c.isalnum())
+
+
+def path_account(path, accounts):
+    # The account named by one of the path's folders or the file name,
+    # ignoring case, spaces and punctuation and with or without "Account":
+    # .../SMB Account/agent_status.csv, .../smb/agent_status.csv
+    names = {}
+    for account in accounts:
+        folded = _folded(account)
+        names.setdefault(folded, account)
+        if folded.endswith("account") and folded != "account":
+            names.setdefault(folded[:-len("account")], account)
+    for part in reversed(os.path.normpath(path).split(os.sep)):
+        account = names.get(_folded(os.path.splitext(part)[0]))
+        if account is not None:
+            return account
+    return None
+
+
+def summarize_site(path, accounts, site_account=None):
+    # Runs in a worker process, so pandas is imported there and the parse
+    # never holds the dashboard's GIL. site_account is used when the export
+    # has no Account column.
+    import pandas as pd
+    st = os.stat(path)
+    df = pd.read_csv(path, encoding="utf-8-sig", usecols=lambda c: c in ("Account", "Status", "Duration (min)"))
+    n = len(accounts)
+    if "Account" in df.columns:
+        account = pd.Categorical(df["Account"], categories=accounts).codes
+    elif site_account in accounts:
+        account = np.full(len(df), accounts.index(site_account))
+    else:
+        raise ValueError(f"{path} has no Account column and no account is set for it")
+    mine = account >= 0
+    account = account[mine].astype(np.int64)
+    agents = np.bincount(account, minlength=n)
+
+    if "Status" in df.columns:
+        status = pd.Categorical(df["Status"].astype(object).where(df["Status"].notna(), None))
+        statuses = [str(s) for s in status.categories]
+        codes = status.codes[mine].astype(np.int64)
+        known = codes >= 0
+        width = len(statuses)
+        counts = np.bincount(account[known] * width + codes[known], minlength=n * width).reshape(n, width)
+    else:
+        statuses, counts = [], np.zeros((n, 0), dtype=np.int64)
+
+    if "Duration (min)" in df.columns:
+        durations = pd.to_numeric(df["Duration (min)"], errors="coerce").to_numpy(dtype=np.float64)[mine]
+        since = st.st_mtime - durations * 60
+        order = np.lexsort((since, account))
+        since = since[order]
+    else:
+        since = np.full(len(account), np.nan)
+    bounds = np.concatenate(([0], np.cumsum(agents)))
+    return SiteSummary((st.st_mtime_ns, st.st_size), statuses, agents, counts, since, bounds)
+
+
+def site_paths(patterns):
+    paths = []
+    for pattern in patterns:
+        matches = sorted(glob.glob(pattern)) if glob.has_magic(pattern) else [pattern]
+        paths.extend(p for p in matches if p not in paths)
+    return paths
+
+
+class SiteIngest:
+    # Follows a set of per-site agent exports through a process pool: each
+    # tick stats every file, re-parses only the ones that changed, one per
+    # worker, and folds the summaries together on the loader thread
+    def __init__(self, patterns, accounts, workers=None):
+        self.patterns = list(patterns)
+        self.accounts = list(accounts)
+        self.workers = workers or os.cpu_count() or 1
+        self._pool = None
+        self._sites = {}
+        self._totals = None
+
+    def _executor(self):
+        if self._pool is None:
+            # spawn, not fork: the dashboard process has Qt and loader threads running
+            self._pool = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context("spawn"))
+        return self._pool
+
+    def _paths(self):
+        # {path: account for exports without an Account column}
+        paths = {}
+        for entry in self.patterns:
+            account, sep, pattern = entry.partition("=")
+            if not sep:
+                account, pattern = None, entry
+            for path in site_paths([pattern]):
+                paths.setdefault(path, account.strip() if account else path_account(path, self.accounts))
+        return paths
+
+    def update(self):
+        paths = self._paths()
+        errors = {}
+        stale = []
+        for path in paths:
+            try:
+                st = os.stat(path)
+            except OSError as e:
+                errors[path] = e
+                continue
+            summary = self._sites.get(path)
+            if summary is None or summary.stat != (st.st_mtime_ns, st.st_size):
+                stale.append(path)
+
+        changed = set(self._sites) - set(paths)
+        for path in changed:
+            del self._sites[path]
+        if stale:
+            try:
+                futures = {path: self._executor().submit(summarize_site, path, self.accounts, paths[path]) for path in stale}
+                for path, future in futures.items():
+                    try:
+                        self._sites[path] = future.result()
+                        changed.add(path)
+                    except (OSError, ValueError) as e:
+                        # Half-written or unassigned export; keep the last good summary
+                        errors[path] = e
+            except BrokenProcessPool:
+                self._pool = None
+                raise
+        if changed or self._totals is None or errors.keys() != self._totals.errors.keys():
+            self._totals = self._merge(errors)
+        return self._totals
+
+    def _merge(self, errors):
+        n = len(self.accounts)
+        sites = list(self._sites.values())
+        statuses = sorted({s for site in sites for s in site.statuses})
+        column = {s: i for i, s in enumerate(statuses)}
+        agents = np.zeros(n, dtype=np.int64)
+        counts = np.zeros((n, len(statuses)), dtype=np.int64)
+        for site in sites:
+            agents += site.agents
+            if site.statuses:
+                counts[:, [column[s] for s in site.statuses]] += site.counts
+        parts = []
+        for i in range(n):
+            times = np.concatenate([site.since[site.bounds[i]:site.bounds[i + 1]] for site in sites]) if sites else np.empty(0)
+            parts.append(np.sort(times))
+        bounds = np.concatenate(([0], np.cumsum(agents)))
+        since = np.concatenate(parts) if parts else np.empty(0)
+        return SiteTotals(len(sites), statuses, agents, counts, since, bounds, errors)
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown(cancel_futures=True)
+            self._pool = None
+
+
+def install_sites(store, accounts):
+    # RTM_SITES=/exports/*/agent_status.csv adds a "sites" result to every
+    # snapshot with all sites' agents per account
+    value = os.environ.get(SITES_VARIABLE)
+    if not value:
+        return None
+    from PyQt5.QtWidgets import QApplication
+    ingest = SiteIngest([p for p in value.split(os.pathsep) if p], accounts)
+    store.follow("sites", (), ingest)
+    QApplication.instance().aboutToQuit.connect(ingest.close)
+    return ingest
@@ -0,0 +1,119 @@
+from collections import deque, namedtuple
+
+# Rolling SL windows in minutes of interval start time
+WINDOWS = (("1h", 60), ("4h", 240), ("day", 1440))
+
+AccountSL = namedtuple("AccountSL", ["latest_sl", "interval", "dropped_total", "dropped_latest", "avg_1h", "avg_4h", "avg_day"])
+
+
+def interval_start(interval):
+    # "09:30-10:00" -> 570
+    hours, minutes = str(interval).split("-", 1)[0].strip().split(":")[:2]
+    return int(hours) * 60 + int(minutes)
+
+
+def rolling_text(summary):
+    parts = []
+    for name, _ in WINDOWS:
+        value = getattr(summary, f"avg_{name}")
+        if value is not None:
+            parts.append(f"{name}: {value:.2f}%")
+    return "Rolling SL " + ", ".join(parts) if parts else ""
+
+
+class _RollingMean:
+    def __init__(self, span):
+        self.span = span
+        self.points = deque()
+        self.total = 0.0
+
+    def add(self, minute, value):
+        self.points.append((minute, value))
+        self.total += value
+        while self.points[0][0] <= minute - self.span:
+            self.total -= self.points.popleft()[1]
+
+    def mean(self):
+        return self.total / len(self.points) if self.points else None
+
+
+class _AccountState:
+    def __init__(self):
+        self.latest_sl = None
+        self.interval = None
+        self.dropped_total = 0
+        self.dropped_latest = None
+        self.rolling = {name: _RollingMean(span) for name, span in WINDOWS}
+        self.day_offset = 0
+        self.last_start = None
+
+    def add(self, interval, sl, dropped):
+        self.interval = interval
+        if dropped is not None and dropped == dropped:
+            self.dropped_total += dropped
+            self.dropped_latest = dropped
+        if sl is None or sl != sl:
+            return
+        self.latest_sl = sl
+        try:
+            start = interval_start(interval)
+        except ValueError:
+            return
+        # Intervals only carry a time of day; going backwards means a new day
+        if self.last_start is not None and start < self.last_start:
+            self.day_offset += 1440
+        self.last_start = start
+        for window in self.rolling.values():
+            window.add(self.day_offset + start, sl)
+
+    def summary(self):
+        return AccountSL(
+            self.latest_sl, self.interval, self.dropped_total, self.dropped_latest,
+            *(self.rolling[name].mean() for name, _ in WINDOWS),
+        )
+
+
+class SLAggregator:
+    def __init__(self, sl_columns=("SL %", "Service Level"), dropped_column="Dropped Intervals"):
+        self.sl_columns = sl_columns
+        self.dropped_column = dropped_column
+        self._accounts = {}
+        self._summary = {}
+        self._rows = 0
+        self._reloads = None
+
+    # Called on the loader thread each time the source changes. Only rows
+    # past the last seen position are folded in, unless the source reloaded.
+    def update(self, source):
+        df = source.frame
+        if source.reloads != self._reloads or len(df) < self._rows:
+            self._accounts = {}
+            self._summary = {}
+            self._rows = 0
+            self._reloads = source.reloads
+        if "Account" not in df.columns or len(df) == self._rows:
+            return self._summary
+
+        new = df.iloc[self._rows:]
+        sl_column = next((c for c in self.sl_columns if c in df.columns), None)
+        count = len(new)
+        accounts = new["Account"].tolist()
+        intervals = new["Interval"].tolist() if "Interval" in new.columns else [None] * count
+        sl_values = new[sl_column].tolist() if sl_column else [None] * count
+        dropped = new[self.dropped_column].tolist() if self.dropped_column in new.columns else [None] * count
+
+        touched = set()
+        for account, interval, sl, drop in zip(accounts, intervals, sl_values, dropped):
+            state = self._accounts.get(account)
+            if state is None:
+                state = self._accounts[account] = _AccountState()
+            state.add(interval, sl, drop)
+            touched.add(account)
+
+        # Publish a fresh dict so snapshots already handed to the GUI never change
+        summary = dict(self._summary)
+        for account in touched:
+            summary[account] = self._accounts[account].summary()
+        self._summary = summary
+        self._rows = len(df)
+        return summary
@@ -0,0 +1,174 @@
+import time
+from PyQt5.QtCore import QObject, pyqtSignal
+from csv_reader import CsvReader
+from data_source import CsvSource, SizedReader
+from loader import BackgroundLoader
+from profiler import profiler
+
+SOURCES = {
+    "agents": "agent_status.csv",
+    "sl": "sl_data.csv",
+    "dropped": "dropped_intervals.csv",
+    "risky": "risky_intervals.csv",
+}
+
+# Files polled every tick; small ones are read with the stdlib parser so
+# the dashboards don't need pandas for them
+FAST_SOURCES = ("agents", "sl", "dropped")
+
+# Exports rewritten in place on every refresh rather than appended to
+SNAPSHOT_EXPORTS = ("agents",)
+
+# History files only ever need these columns, whatever else the export adds
+HISTORY_COLUMNS = {
+    "sl": ("Account", "Interval", "SL %", "Service Level", "Dropped Intervals"),
+    "dropped": ("Account", "Interval", "Service Level", "Dropped Intervals"),
+    "risky": ("Time Interval", "Account", "Service Level", "Dropped Calls", "Risk Level"),
+}
+
+
+class DataSnapshot:
+    def __init__(self, tick, frames, versions, derived, changed, errors):
+        self.tick = tick
+        self.frames = frames
+        self.versions = versions
+        self.derived = derived
+        self.changed = changed
+        self.errors = errors
+
+    @property
+    def agents(self):
+        return self.frames.get("agents")
+
+    @property
+    def sl(self):
+        return self.frames.get("sl")
+
+    @property
+    def dropped(self):
+        return self.frames.get("dropped")
+
+    @property
+    def risky(self):
+        return self.frames.get("risky")
+
+
+class SnapshotStore(QObject):
+    updated = pyqtSignal(object)
+    failed = pyqtSignal(str, object)
+
+    def __init__(self, sources=SOURCES, cache=None, parent=None, fast=FAST_SOURCES):
+        super().__init__(parent)
+        self._sources = {}
+        for name, path in sources.items():
+            columns = HISTORY_COLUMNS.get(name)
+            options = {"tail": name not in SNAPSHOT_EXPORTS}
+            if columns is not None:
+                options["usecols"] = lambda c, columns=columns: c in columns
+                options["cache"] = cache
+            if name in fast:
+                # Only exports re-read in full each tick can outgrow the
+                # stdlib reader; tailed files just parse what was appended
+                options["reader"] = SizedReader() if name in SNAPSHOT_EXPORTS else CsvReader()
+            self._sources[name] = CsvSource(path, **options)
+        self._derive = {}
+        self._follow = {}
+        self._tick = 0
+        self._refresh_started = None
+        self.snapshot = None
+        self._loader = BackgroundLoader(self)
+        self._loader.loaded.connect(self._onLoaded)
+        self._loader.failed.connect(lambda e: self.failed.emit("", e))
+
+    def path(self, name):
+        return self._sources[name].path
+
+    def setSource(self, name, source):
+        # Swap in anything with CsvSource's poll/frame/version interface;
+        # call before the first refresh
+        self._sources[name] = source
+
+    def derive(self, key, name, fn):
+        # fn(frame) runs on the loader thread whenever source `name` changes;
+        # panels read the result from snapshot.derived[key]. A fresh result
+        # puts key in snapshot.changed; a failure is reported under key and
+        # the previous result is kept
+        self._derive[key] = (name, fn)
+
+    def follow(self, key, name, consumer):
+        # consumer.update(source) runs on the loader thread every tick and
+        # folds in whatever the source appended; its return value is
+        # published as snapshot.derived[key]. A tuple of names passes one
+        # source per name; an empty tuple calls update() with none.
+        names = (name,) if isinstance(name, str) else tuple(name)
+        self._follow[key] = (names, consumer)
+
+    def refresh(self):
+        self._tick += 1
+        self._refresh_started = time.perf_counter()
+        self._loader.submit(self._load, self._tick, self.snapshot)
+
+    def _load(self, tick, previous):
+        with profiler.tick(tick):
+            return self._loadSources(tick, previous)
+
+    # Runs on the loader thread; every source is polled at most once per tick,
+    # and only if something derives from or follows it
+    def _loadSources(self, tick, previous):
+        frames, versions, derived, changed, errors = {}, {}, {}, set(), {}
+        used = {name for name, _ in list(self._derive.values())}
+        used.update(name for names, _ in list(self._follow.values()) for name in names)
+        for name, source in self._sources.items():
+            if name not in used:
+                continue
+            try:
+                source.poll()
+            except Exception as e:
+                errors[name] = e
+                if previous is not None and name in previous.frames:
+                    frames[name] = previous.frames[name]
+                    versions[name] = previous.versions[name]
+                continue
+            frames[name] = source.frame
+            versions[name] = source.version
+            if previous is None or previous.versions.get(name) != source.version:
+                changed.add(name)
+
+        for key, (name, fn) in list(self._derive.items()):
+            reusable = previous is not None and key in previous.derived
+            if name in changed or not reusable:
+                if name not in frames:
+                    continue
+                try:
+                    with profiler.span("derive", key):
+                        derived[key] = fn(frames[name])
+                    changed.add(key)
+                    continue
+                except Exception as e:
+                    errors[key] = e
+                    changed.discard(key)
+            if reusable:
+                derived[key] = previous.derived[key]
+
+        # Copied since the GUI thread may add followers while a load runs
+        for key, (names, consumer) in list(self._follow.items()):
+            if all(name in frames and name not in errors for name in names):
+                try:
+                    with profiler.span("derive", key):
+                        derived[key] = consumer.update(*(self._sources[name] for name in names))
+                    continue
+                except Exception as e:
+                    errors[names[0] if names else key] = e
+            if previous is not None and key in previous.derived:
+                derived[key] = previous.derived[key]
+        return DataSnapshot(tick, frames, versions, derived, changed, errors)
+
+    def _onLoaded(self, snapshot):
+        self.snapshot = snapshot
+        profiler.last_tick = snapshot.tick
+        with profiler.tick(snapshot.tick):
+            for name, e in snapshot.errors.items():
+                self.failed.emit(name, e)
+            self.updated.emit(snapshot)
+        if snapshot.tick == self._tick and self._refresh_started is not None:
+            profiler.record("refresh", self._refresh_started, time.perf_counter() - self._refresh_started, tick=snapshot.tick)
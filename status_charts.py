@@ -0,0 +1,129 @@
+from collections import deque
+from PyQt5.QtChart import QChart, QDateTimeAxis, QLineSeries, QPieSeries, QValueAxis
+from PyQt5.QtCore import QDateTime, QObject, QPointF, Qt, QTimer
+from PyQt5.QtGui import QGuiApplication, QPainter
+
+# Logged in but not taking work
+NOT_READY_STATUSES = ("AUX", "Break", "Unaligned AUX")
+# Any other logged-in status (On Call, ACW, ...) means the agent is busy
+IDLE_STATUSES = ("Available", "Offline") + NOT_READY_STATUSES
+HISTORY_POINTS = 360  # one hour of 10 s refreshes
+
+
+def status_counts(df):
+    # {account: {status: count}}; the None key holds the whole floor
+    counts = {None: {str(k): int(v) for k, v in df["Status"].value_counts(sort=False).items()}}
+    if "Account" in df.columns:
+        sizes = df.groupby(["Account", "Status"], sort=False, observed=True).size()
+        for (account, status), n in sizes.items():
+            counts.setdefault(account, {})[str(status)] = int(n)
+    return counts
+
+
+def occupancy_utilization(counts):
+    # Utilization: share of logged-in agents that are ready (not AUX/Break).
+    # Occupancy: share of ready agents that are busy rather than Available;
+    # only meaningful once the export reports a busy status at all
+    logged_in = sum(counts.values()) - counts.get("Offline", 0)
+    ready = logged_in - sum(counts.get(s, 0) for s in NOT_READY_STATUSES)
+    utilization = 100.0 * ready / logged_in if logged_in else 0.0
+    occupancy = 100.0 * (ready - counts.get("Available", 0)) / ready if ready else 0.0
+    return occupancy, utilization
+
+
+class StatusCharts(QObject):
+    def __init__(self, pie_view, trend_view, parent=None):
+        super().__init__(parent)
+        self._counts = {}
+        self._account = None
+        self._history = {}
+        self._slices = {}
+        self._busy_seen = False
+
+        self.pie = QPieSeries()
+        pie_chart = QChart()
+        pie_chart.setTheme(QChart.ChartThemeDark)
+        pie_chart.setTitle("Agent Status")
+        pie_chart.addSeries(self.pie)
+        pie_chart.legend().setAlignment(Qt.AlignRight)
+        pie_view.setChart(pie_chart)
+        pie_view.setRenderHint(QPainter.Antialiasing)
+
+        self.occupancy = QLineSeries()
+        self.occupancy.setName("Occupancy %")
+        self.utilization = QLineSeries()
+        self.utilization.setName("Utilization %")
+        trend_chart = self.trend_chart = QChart()
+        trend_chart.setTheme(QChart.ChartThemeDark)
+        trend_chart.setTitle("Utilization")
+        trend_chart.addSeries(self.occupancy)
+        trend_chart.addSeries(self.utilization)
+        # Hidden until a busy status shows up; with only Available and the
+        # not-ready statuses it would be a flat 0%
+        self.occupancy.setVisible(False)
+        self.time_axis = QDateTimeAxis()
+        self.time_axis.setFormat("hh:mm")
+        self.percent_axis = QValueAxis()
+        self.percent_axis.setRange(0, 100)
+        self.percent_axis.setLabelFormat("%d")
+        trend_chart.addAxis(self.time_axis, Qt.AlignBottom)
+        trend_chart.addAxis(self.percent_axis, Qt.AlignLeft)
+        for series in (self.occupancy, self.utilization):
+            series.attachAxis(self.time_axis)
+            series.attachAxis(self.percent_axis)
+        trend_view.setChart(trend_chart)
+        trend_view.setRenderHint(QPainter.Antialiasing)
+
+        # Updates are coalesced and drawn at most once per screen frame
+        screen = QGuiApplication.primaryScreen()
+        rate = screen.refreshRate() if screen is not None and screen.refreshRate() > 0 else 60
+        self._render_timer = QTimer(self)
+        self._render_timer.setSingleShot(True)
+        self._render_timer.setInterval(max(1, int(1000 / rate)))
+        self._render_timer.timeout.connect(self._render)
+
+    def addSample(self, counts):
+        now = QDateTime.currentMSecsSinceEpoch()
+        if not self._busy_seen:
+            self._busy_seen = any(n and s not in IDLE_STATUSES for c in counts.values() for s, n in c.items())
+            if self._busy_seen:
+                self.occupancy.setVisible(True)
+                self.trend_chart.setTitle("Occupancy / Utilization")
+        for account, account_counts in counts.items():
+            history = self._history.get(account)
+            if history is None:
+                history = self._history[account] = deque(maxlen=HISTORY_POINTS)
+            occupancy, utilization = occupancy_utilization(account_counts)
+            history.append((now, occupancy if self._busy_seen else None, utilization))
+        self._counts = counts
+        self._schedule()
+
+    def setAccount(self, account):
+        self._account = account
+        self._schedule()
+
+    def _schedule(self):
+        if not self._render_timer.isActive():
+            self._render_timer.start()
+
+    def _render(self):
+        key = self._account if self._account in self._counts else None
+        counts = self._counts.get(key, {})
+
+        # Slices are updated in place; only new or vanished statuses add or remove one
+        for status, count in counts.items():
+            pie_slice = self._slices.get(status)
+            if pie_slice is None:
+                pie_slice = self._slices[status] = self.pie.append(status, count)
+            else:
+                pie_slice.setValue(count)
+            pie_slice.setLabel(f"{status}: {count}")
+        for status in [s for s in self._slices if s not in counts]:
+            self.pie.remove(self._slices.pop(status))
+
+        history = self._history.get(key, ())
+        self.occupancy.replace([QPointF(t, occupancy) for t, occupancy, _ in history if occupancy is not None])
+        self.utilization.replace([QPointF(t, utilization) for t, _, utilization in history])
+        if history:
+            first, last = history[0][0], history[-1][0]
+            self.time_axis.setRange(QDateTime.fromMSecsSinceEpoch(first), QDateTime.fromMSecsSinceEpoch(max(last, first + 60000)))
@@ -0,0 +1,268 @@
+import os
+import sqlite3
+import threading
+import time
+from collections import namedtuple
+from datetime import datetime, timedelta
+import numpy as np
+from PyQt5.QtWidgets import QComboBox, QHBoxLayout, QLabel, QLineEdit, QTableWidget, QTableWidgetItem, QVBoxLayout, QWidget
+from agent_store import DURATION_COLUMN, KEY_COLUMN, SINCE_COLUMN, _categorical, _floats, _missing
+
+HISTORY_DB = os.path.join(".rtm_cache", "status_history.sqlite")
+INTERVAL_MINUTES = 30
+
+# The recorder's view of the last agents version, sorted by login
+AgentStates = namedtuple("AgentStates", ["logins", "status", "account", "since"])
+
+# One row per status change; status is NULL once the agent leaves the export.
+# The (login_id, ts) key doubles as the per-agent time index, and every
+# agent gets a row at midnight so a day's queries never look further back.
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS status_events (
+    login_id TEXT NOT NULL,
+    ts REAL NOT NULL,
+    status TEXT,
+    account TEXT,
+    PRIMARY KEY (login_id, ts)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS status_events_ts ON status_events (ts);
+"""
+
+
+def day_start(ts):
+    return datetime.fromtimestamp(ts).replace(hour=0, minute=0, second=0, microsecond=0).timestamp()
+
+
+def interval_label(ts, minutes=INTERVAL_MINUTES):
+    # Same "09:00-09:30" form as the Interval column in sl_data.csv
+    start = datetime.fromtimestamp(ts)
+    return f"{start:%H:%M}-{start + timedelta(minutes=minutes):%H:%M}"
+
+
+def _occupancy(starts, ends, edges):
+    # Agent-seconds inside each [edges[i], edges[i + 1]) for a set of
+    # [start, end) segments: integrate the running headcount at the edges
+    starts = np.clip(starts, edges[0], edges[-1])
+    ends = np.clip(ends, edges[0], edges[-1])
+    times = np.concatenate((starts, ends))
+    order = np.argsort(times, kind="stable")
+    times = times[order]
+    level = np.cumsum(np.concatenate((np.ones(len(starts)), -np.ones(len(ends))))[order])
+    area = np.concatenate(([0.0], np.cumsum(level[:-1] * np.diff(times))))
+    i = np.searchsorted(times, edges, side="right") - 1
+    valid = i >= 0
+    at_edges = np.zeros(len(edges))
+    at_edges[valid] = area[i[valid]] + level[i[valid]] * (edges[valid] - times[i[valid]])
+    return np.diff(at_edges)
+
+
+class StatusHistory:
+    # Append-only status log in SQLite. WAL lets the GUI read while the
+    # loader thread writes; each thread gets its own connection.
+    def __init__(self, path=HISTORY_DB):
+        self.path = path
+        self._local = threading.local()
+
+    def _connection(self):
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            connection = sqlite3.connect(self.path, timeout=5)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.executescript(SCHEMA)
+            self._local.connection = connection
+        return connection
+
+    def record(self, events):
+        # events: (login_id, ts, status, account) tuples. A restart replays
+        # the same changes with the same times, so those are ignored.
+        connection = self._connection()
+        with connection:
+            cursor = connection.executemany("INSERT OR IGNORE INTO status_events VALUES (?, ?, ?, ?)", events)
+        return cursor.rowcount
+
+    def agent_totals(self, login_id, start, end=None):
+        # {status: seconds} for one agent, from the last change at or before
+        # start through end; a handful of index lookups
+        end = time.time() if end is None else end
+        rows = self._connection().execute(
+            "SELECT ts, status FROM status_events WHERE login_id = ? AND ts < ? AND ts >= "
+            "(SELECT coalesce(max(ts), ?) FROM status_events WHERE login_id = ? AND ts <= ?) ORDER BY ts",
+            (login_id, end, start, login_id, start)).fetchall()
+        totals = {}
+        for (ts, status), (next_ts, _) in zip(rows, rows[1:] + [(end, None)]):
+            seconds = min(next_ts, end) - max(ts, start)
+            if status is not None and seconds > 0:
+                totals[status] = totals.get(status, 0.0) + seconds
+        return totals
+
+    def interval_counts(self, start, end=None, account=None, minutes=INTERVAL_MINUTES):
+        # Average agents in each status per interval bucket of `minutes`,
+        # aligned to the day like sl_data.csv; returns (bucket start times,
+        # statuses, buckets x statuses)
+        end = time.time() if end is None else end
+        step = minutes * 60
+        first = day_start(start)
+        edges = np.arange(first + (start - first) // step * step, end + step, step)
+        rows = self._connection().execute(
+            "SELECT login_id, ts, status, account FROM status_events WHERE ts >= ? AND ts < ? "
+            "ORDER BY login_id, ts", (first, edges[-1])).fetchall()
+        if not rows or len(edges) < 2:
+            return edges[:-1], [], np.zeros((max(len(edges) - 1, 0), 0))
+        logins, ts, status, accounts = (np.array(column, dtype=object) for column in zip(*rows))
+        ts = ts.astype(np.float64)
+        ends = np.append(ts[1:], end)
+        last = np.append(logins[1:] != logins[:-1], True)
+        ends[last] = end
+        ends = np.minimum(ends, end)
+        keep = ~_missing(status)
+        if account is not None:
+            keep &= accounts == account
+        statuses, codes = np.unique(status[keep].astype(str), return_inverse=True)
+        starts, ends = ts[keep], ends[keep]
+        counts = np.zeros((len(edges) - 1, len(statuses)))
+        for i in range(len(statuses)):
+            mine = codes == i
+            counts[:, i] = _occupancy(starts[mine], ends[mine], edges) / step
+        return edges[:-1], [str(s) for s in statuses], counts
+
+
+class StatusRecorder:
+    # Follows the agents source on the loader thread and writes each status
+    # change it sees; returns how many events have been recorded so pages
+    # can tell when to re-query
+    def __init__(self, history):
+        self.history = history
+        self.recorded = 0
+        self._version = None
+        self._state = None
+        self._day = None
+
+    def update(self, source):
+        now = time.time()
+        if source.version != self._version:
+            self._version = source.version
+            self._apply(source.frame, now)
+        day = day_start(now)
+        if day != self._day and self._state is not None:
+            self._day = day
+            # Statuses carried over from before midnight start the day
+            state = self._state
+            carried = state.since < day
+            events = zip(state.logins[carried].tolist(), [day] * int(carried.sum()), state.status[carried], state.account[carried])
+            self.recorded += max(self.history.record(list(events)), 0)
+        return self.recorded
+
+    def _apply(self, df, now):
+        # Reads columns with np.asarray like AgentStore, so a CsvTable
+        # version is recorded without converting it to pandas
+        if KEY_COLUMN not in df.columns or "Status" not in df.columns:
+            return
+        # Sorted by login; the last row wins for a duplicated ID
+        logins, first = np.unique(np.asarray(df[KEY_COLUMN]).astype(str)[::-1], return_index=True)
+        rows = len(df) - 1 - first
+        state = AgentStates(
+            logins,
+            self._labels(df["Status"])[rows],
+            self._labels(df["Account"])[rows] if "Account" in df.columns else np.full(len(rows), None, dtype=object),
+            self._since(df, now)[rows],
+        )
+
+        changed = np.ones(len(logins), dtype=bool)
+        gone = []
+        if self._state is not None:
+            old = self._state
+            _, new_rows, old_rows = np.intersect1d(logins, old.logins, assume_unique=True, return_indices=True)
+            changed[new_rows] = old.status[old_rows] != state.status[new_rows]
+            left = np.ones(len(old.logins), dtype=bool)
+            left[old_rows] = False
+            gone = zip(old.logins[left].tolist(), old.account[left])
+        events = list(zip(logins[changed].tolist(), state.since[changed].tolist(), state.status[changed], state.account[changed]))
+        events += [(login_id, now, None, account) for login_id, account in gone]
+        if events:
+            self.recorded += max(self.history.record(events), 0)
+        self._state = state
+
+    def _labels(self, values):
+        # Category codes mapped back to labels, None where the cell is empty
+        codes, labels = _categorical(values)
+        labels[-1] = None
+        return labels[codes]
+
+    def _since(self, df, now):
+        # Wall-clock time of each agent's current status
+        exported = df.attrs.get("mtime", now)
+        since = np.full(len(df), now)
+        if DURATION_COLUMN in df.columns:
+            minutes = _floats(df[DURATION_COLUMN])
+            since = np.where(np.isnan(minutes), now, exported - minutes * 60)
+        if SINCE_COLUMN in df.columns:
+            # Pushed events carry monotonic change times
+            known = _floats(df[SINCE_COLUMN])
+            since = np.where(np.isnan(known), since, now - (time.monotonic() - known))
+        return np.minimum(since, now)
+
+
+class HistoryPanel(QWidget):
+    # Today's status mix per interval, plus one agent's time in each status
+    def __init__(self, history, accounts, parent=None):
+        super().__init__(parent)
+        self.history = history
+        self._recorded = None
+        layout = QVBoxLayout(self)
+        top = QHBoxLayout()
+        self.account_dropdown = QComboBox()
+        self.account_dropdown.addItem("All Accounts")
+        self.account_dropdown.addItems(accounts)
+        self.account_dropdown.currentIndexChanged.connect(self.updateTable)
+        top.addWidget(QLabel("Account:"))
+        top.addWidget(self.account_dropdown)
+        self.agent_box = QLineEdit()
+        self.agent_box.setPlaceholderText("Login ID...")
+        self.agent_box.editingFinished.connect(self.updateAgent)
+        top.addWidget(self.agent_box)
+        self.agent_label = QLabel()
+        top.addWidget(self.agent_label)
+        top.addStretch()
+        layout.addLayout(top)
+        layout.addWidget(QLabel("Average agents per status and interval, today"))
+        self.table = QTableWidget(0, 0)
+        self.table.setEditTriggers(QTableWidget.NoEditTriggers)
+        layout.addWidget(self.table)
+
+    def setRecorded(self, recorded):
+        if recorded == self._recorded:
+            return
+        self._recorded = recorded
+        self.updateTable()
+        self.updateAgent()
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.updateTable()
+        self.updateAgent()
+
+    def updateTable(self):
+        if not self.isVisible():
+            return
+        account = self.account_dropdown.currentText() if self.account_dropdown.currentIndex() > 0 else None
+        starts, statuses, counts = self.history.interval_counts(day_start(time.time()), account=account)
+        self.table.setColumnCount(len(statuses))
+        self.table.setHorizontalHeaderLabels(statuses)
+        self.table.setRowCount(len(starts))
+        self.table.setVerticalHeaderLabels([interval_label(ts) for ts in starts])
+        for i, row in enumerate(counts):
+            for j, value in enumerate(row):
+                self.table.setItem(i, j, QTableWidgetItem(f"{value:.1f}"))
+
+    def updateAgent(self):
+        login_id = self.agent_box.text().strip()
+        if not self.isVisible() or not login_id:
+            self.agent_label.clear()
+            return
+        totals = self.history.agent_totals(login_id, day_start(time.time()))
+        if not totals:
+            self.agent_label.setText("No status changes today")
+            return
+        self.agent_label.setText("  ".join(f"{status}: {seconds / 60:.0f} min" for status, seconds in sorted(totals.items())))
@@ -0,0 +1,104 @@
+import os
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+import numpy as np
+import pytest
+from PyQt5.QtCore import QtWarningMsg, qInstallMessageHandler
+from PyQt5.QtTest import QAbstractItemModelTester
+from PyQt5.QtWidgets import QApplication
+from agent_store import AgentStore
+from agent_table import FETCH_BATCH, AgentTableModel
+from csv_reader import read_table
+from row_diff import diff_rows
+
+app = QApplication.instance() or QApplication([])
+
+
+def _agents(logins, statuses=None):
+    statuses = statuses or {}
+    lines = ["Login ID,Status,Duration (min)"] + [f"{login},{statuses.get(login, 'AUX')},5" for login in logins]
+    store = AgentStore(read_table("\n".join(lines).encode()))
+    return store.take(np.arange(store.size))
+
+
+def _shown(model, column=0):
+    return [model.index(row, column).data() for row in range(model.rowCount())]
+
+
+@pytest.fixture
+def model():
+    warnings = []
+
+    def handler(kind, context, message):
+        if kind >= QtWarningMsg:
+            warnings.append(message)
+
+    previous = qInstallMessageHandler(handler)
+    model = AgentTableModel()
+    tester = QAbstractItemModelTester(model, QAbstractItemModelTester.FailureReportingMode.Warning)
+    yield model
+    qInstallMessageHandler(previous)
+    del tester
+    assert not [w for w in warnings if "FAIL" in w], warnings
+
+
+def test_diff_rows():
+    old, new = np.array([1, 2, 3, 4], dtype=np.uint64), np.array([1, 3, 5, 4, 6], dtype=np.uint64)
+    diff = diff_rows(old, np.array([0, 0, 0, 0], dtype=np.uint64), new, np.array([0, 9, 0, 0, 0], dtype=np.uint64))
+    assert diff.removed == [(1, 1)]
+    assert diff.inserted == [(2, 2), (4, 4)]
+    assert diff.updated.tolist() == [1]
+    assert diff.kept_old.tolist() == [0, 2, 3] and diff.kept_new.tolist() == [0, 1, 3]
+    # Reordered or duplicated keys can't be patched
+    assert diff_rows(old, old, old[::-1], old) is None
+    assert diff_rows(old, old, np.array([1, 1], dtype=np.uint64), np.zeros(2, dtype=np.uint64)) is None
+
+
+def test_removals_read_consistent_rows(model):
+    logins = [str(20000 + i) for i in range(100)]
+    model.setRows(_agents(logins))
+    kept = [login for i, login in enumerate(logins) if i not in (10, 50, 90)]
+    seen = []
+
+    def onRemoved(parent, first, last):
+        # The view may read any row as soon as a block is gone
+        try:
+            seen.append(model.index(model.rowCount() - 1, 0).data())
+        except Exception as e:
+            seen.append(e)
+
+    model.rowsRemoved.connect(onRemoved)
+    model.setRows(_agents(kept))
+    assert seen == [logins[-1]] * 3
+    assert _shown(model) == kept
+
+
+def test_inserts_and_updates(model):
+    logins = [str(20000 + i) for i in range(20)]
+    model.setRows(_agents(logins))
+    inserted = []
+    changed = []
+    model.rowsInserted.connect(lambda parent, first, last: inserted.append((first, last, _shown(model))))
+    model.dataChanged.connect(lambda first, last, roles: changed.append((first.row(), last.row())))
+
+    new = logins[:5] + ["A1", "A2"] + logins[5:] + ["A3"]
+    model.setRows(_agents(new, {logins[8]: "Break"}))
+    assert [(first, last) for first, last, _ in inserted] == [(5, 6), (22, 22)]
+    # Each insert is visible with the rows before it already in place
+    assert inserted[0][2] == logins[:5] + ["A1", "A2"] + logins[5:]
+    assert _shown(model) == new
+    assert _shown(model, 1)[new.index(logins[8])] == "Break"
+    assert (10, 10) in changed
+
+
+def test_trailing_insert_is_one_batch():
+    # No model tester here: it calls fetchMore on every insert
+    model = AgentTableModel()
+    logins = [str(20000 + i) for i in range(FETCH_BATCH * 3)]
+    model.setRows(_agents(logins))
+    model.setRows(_agents([]))
+    assert model.rowCount() == 0
+    model.setRows(_agents(logins))
+    assert model.rowCount() == FETCH_BATCH
+    while model.canFetchMore():
+        model.fetchMore()
+    assert _shown(model) == logins
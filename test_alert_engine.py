@@ -0,0 +1,40 @@
+import os
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+from PyQt5.QtWidgets import QApplication
+from agent_store import AgentStore
+from alert_engine import AlertEngine
+from csv_reader import read_table
+
+app = QApplication.instance() or QApplication([])
+
+
+def _store(rows):
+    lines = ["Login ID,Status,Duration (min),Account"] + [",".join(row) for row in rows]
+    return AgentStore(read_table("\n".join(lines).encode()))
+
+
+def _tracked(engine):
+    return {login: agent[0] for login, agent in engine._agents.items()}
+
+
+def test_empty_then_full_store():
+    engine = AlertEngine()
+    engine.setDurationLimit(10)
+    engine.setAgents(_store([]))
+    engine.setAgents(_store([("1001", "AUX", "12", "A"), ("1002", "Available", "3", "A")]))
+    assert _tracked(engine) == {"1001": "AUX", "1002": "Available"}
+    assert [alert.subject for alert in engine.alerts] == ["1001"]
+
+
+def test_changed_rows_are_retracked():
+    engine = AlertEngine()
+    engine.setAgents(_store([("1001", "AUX", "2", "A"), ("1002", "Available", "3", "A"), ("1003", "Break", "1", "B")]))
+    # Same order, one row updated
+    engine.setAgents(_store([("1001", "AUX", "2", "A"), ("1002", "Break", "0", "A"), ("1003", "Break", "1", "B")]))
+    assert _tracked(engine) == {"1001": "AUX", "1002": "Break", "1003": "Break"}
+    # One agent logs out, another logs in
+    engine.setAgents(_store([("1001", "AUX", "2", "A"), ("1003", "Break", "1", "B"), ("1004", "AUX", "0", "B")]))
+    assert _tracked(engine) == {"1001": "AUX", "1003": "Break", "1004": "AUX"}
+    # Reordered export
+    engine.setAgents(_store([("1004", "Available", "0", "B"), ("1001", "AUX", "2", "A")]))
+    assert _tracked(engine) == {"1001": "AUX", "1004": "Available"}
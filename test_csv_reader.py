@@ -0,0 +1,29 @@
+import numpy as np
+import pytest
+from csv_reader import read_table
+
+
+def test_bom_and_types():
+    table = read_table(b"\xef\xbb\xbfLogin ID,Status,SL %\r\n1001,AUX,80.5\r\n1002,,\r\n")
+    assert table.columns == ["Login ID", "Status", "SL %"]
+    assert table["Login ID"].dtype == np.int64
+    assert table["Status"][0] == "AUX" and table["Status"][1] != table["Status"][1]
+    assert np.isnan(table["SL %"][1])
+
+
+def test_short_rows_are_padded():
+    table = read_table(b"a,b,c\n1,2\n3,4,5\n")
+    assert list(table["a"]) == [1, 3]
+    assert np.isnan(table["c"][0]) and table["c"][1] == 5
+
+
+def test_long_row_is_an_error():
+    # A short and a long row together have the right number of fields
+    with pytest.raises(ValueError):
+        read_table(b"a,b,c\n1,2\n3,4,5,6\n")
+
+
+def test_quoted_fields():
+    table = read_table(b'a,b\n"x,1",2\n"y""z",3\n')
+    assert list(table["a"]) == ["x,1", 'y"z']
+    assert list(table["b"]) == [2, 3]
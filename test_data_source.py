@@ -0,0 +1,91 @@
+import os
+import pytest
+from column_cache import ColumnCache
+from csv_reader import CsvReader
+from data_source import CsvSource, PandasReader
+
+
+def _write(path, text, mtime_ns):
+    with open(path, "w", newline="") as f:
+        f.write(text)
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+@pytest.mark.parametrize("reader", [PandasReader, CsvReader])
+@pytest.mark.parametrize("tail", [True, False])
+def test_same_size_rewrite_reloads(tmp_path, reader, tail):
+    path = str(tmp_path / "agent_status.csv")
+    _write(path, "Login ID,Status,Duration (min)\n1001,AUX,12\n1002,Available,3\n", 1_000_000_000_000)
+    source = CsvSource(path, reader=reader(), tail=tail)
+    assert source.poll()
+    _write(path, "Login ID,Status,Duration (min)\n1001,AUX,13\n1002,Available,4\n", 2_000_000_000_000)
+    assert source.poll()
+    assert source.appended is None
+    assert list(source.frame["Duration (min)"]) == [13, 4]
+
+
+@pytest.mark.parametrize("reader", [PandasReader, CsvReader])
+def test_snapshot_export_ignores_matching_prefix(tmp_path, reader):
+    # Middle rows edited in place plus a row added: looks like an append
+    path = str(tmp_path / "agent_status.csv")
+    _write(path, "Login ID,Status,Duration (min)\n1001,AUX,12\n1002,Available,3\n", 1_000_000_000_000)
+    source = CsvSource(path, reader=reader(), tail=False)
+    source.poll()
+    _write(path, "Login ID,Status,Duration (min)\n1001,AUX,19\n1002,Available,3\n1003,Break,1\n", 2_000_000_000_000)
+    assert source.poll()
+    assert list(source.frame["Duration (min)"]) == [19, 3, 1]
+
+
+def test_append_is_tailed(tmp_path):
+    path = str(tmp_path / "sl_data.csv")
+    _write(path, "Account,Interval,SL %\nA,09:00-09:30,80\n", 1_000_000_000_000)
+    source = CsvSource(path, reader=CsvReader())
+    source.poll()
+    _write(path, "Account,Interval,SL %\nA,09:00-09:30,80\nA,09:30-10:00,75\n", 2_000_000_000_000)
+    assert source.poll()
+    assert source.appended == 1
+    assert list(source.frame["SL %"]) == [80, 75]
+
+
+def test_cache_resumes_after_append(tmp_path):
+    path = str(tmp_path / "sl_data.csv")
+    _write(path, "Account,Interval,SL %\nA,09:00-09:30,80\nA,09:30-10:00,75\n", 1_000_000_000_000)
+    cache = ColumnCache(str(tmp_path / "cache"))
+    CsvSource(path, cache=cache, reader=CsvReader()).poll()
+    with open(path, "a", newline="") as f:
+        f.write("A,10:00-10:30,70\n")
+    os.utime(path, ns=(2_000_000_000_000, 2_000_000_000_000))
+
+    source = CsvSource(path, cache=cache, reader=CsvReader())
+    source.reader.read = None  # only the appended tail may be parsed
+    assert source.poll()
+    assert list(source.frame["SL %"]) == [80, 75, 70]
+
+
+def test_cache_ignored_after_rewrite(tmp_path):
+    path = str(tmp_path / "sl_data.csv")
+    _write(path, "Account,Interval,SL %\nA,09:00-09:30,80\n", 1_000_000_000_000)
+    cache = ColumnCache(str(tmp_path / "cache"))
+    CsvSource(path, cache=cache, reader=CsvReader()).poll()
+    _write(path, "Account,Interval,SL %\nB,09:00-09:30,80\nA,09:30-10:00,75\n", 2_000_000_000_000)
+    source = CsvSource(path, cache=cache, reader=CsvReader())
+    source.poll()
+    assert list(source.frame["Account"]) == ["B", "A"]
+
+
+@pytest.mark.parametrize("reader", [PandasReader, CsvReader])
+def test_partial_row_with_usecols(tmp_path, reader):
+    path = str(tmp_path / "sl_data.csv")
+    _write(path, "Account,Interval,SL %,Dropped Intervals\nA,09:00-09:30,80,1\n", 1_000_000_000_000)
+    source = CsvSource(path, reader=reader(), usecols=lambda c: c in ("Account", "SL %"))
+    source.poll()
+    with open(path, "a", newline="") as f:
+        f.write("A,09:30-10:00,7")
+    os.utime(path, ns=(2_000_000_000_000, 2_000_000_000_000))
+    assert source.poll()
+    with open(path, "a", newline="") as f:
+        f.write("5,0\n")
+    os.utime(path, ns=(3_000_000_000_000, 3_000_000_000_000))
+    assert source.poll()
+    assert list(source.frame.columns) == ["Account", "SL %"]
+    assert list(source.frame["SL %"]) == [80, 75]
@@ -1,11 +1,22 @@
 import sys
-import pandas as pd
 from PyQt5.QtWidgets import (
-    QApplication, QMainWindow, QPushButton, QTableWidget, QTableWidgetItem,
+    QApplication, QMainWindow, QPushButton, QTableWidget,
     QVBoxLayout, QWidget, QLabel, QHBoxLayout, QStackedWidget, QComboBox, QLineEdit, QSpinBox
 )
 from PyQt5.QtCore import QTimer
-from PyQt5.QtGui import QFont, QColor, QIcon
+from PyQt5.QtGui import QFont, QIcon
+from agent_filter import AgentFilter
+from alert_engine import AlertEngine, AlertTray
+from agent_store import AgentStore, LastKnownSaver
+from agent_table import AgentTableModel, AgentTableView
+from sl_aggregator import SLAggregator, rolling_text
+from profiler_panel import install_profiler
+from scheduler import RefreshScheduler
+
+RISK_PAGE = 1
+WALLBOARD_PAGE = 2
+HISTORY_PAGE = 3
+ALERTS_PAGE = 4
 
 class RTMApp(QMainWindow):
     def __init__(self):
@@ -15,13 +26,67 @@ class RTMApp(QMainWindow):
 
         self.accounts = ["101 Account", "Non Voice Account", "SMB Account", "Smiles Account", "Prestige Account"]
         self.nav_visible = False
+        self.store = None
+        self.scheduler = None
+        self.agent_filter = None
+        self.pages = {}
+        self.live_pages = []
+        self.risk_panel = None
+        self.wallboard = None
+        self.history = None
+        self.history_panel = None
+        self.alert_panel = None
+        self.alerts = AlertEngine(self)
+        self.filter_timer = QTimer(self)
+        self.filter_timer.setSingleShot(True)
+        self.filter_timer.setInterval(250)
+        self.filter_timer.timeout.connect(self.applyFilters)
         self.initUI()
-        self.loadData()
-        self.loadSLData()
+        self.live_pages.append(self.mainPage)
+        self.alert_tray = AlertTray(self.alerts, QIcon("menu_icon.png"), on_click=self.showAlerts, parent=self)
+        self.applyThresholds()
+        self.showLastKnown()
+        self.profiler_overlay = install_profiler(self, on_first_frame=self.startData)
+
+    def showLastKnown(self):
+        # Paint the table from the last run while the real data loads
+        store = AgentStore.load()
+        if store is not None:
+            self.agent_filter = AgentFilter(store)
+            self.applyFilters()
 
-        self.timer = QTimer(self)
-        self.timer.timeout.connect(self.loadData)
-        self.timer.start(10000)
+    def startData(self):
+        # pandas and the rest of the data layer load after the first frame
+        from column_cache import ColumnCache
+        from push_feed import install_feed
+        from site_ingest import install_sites
+        from snapshot import SnapshotStore
+        from status_history import StatusHistory, StatusRecorder
+        self.store = SnapshotStore(cache=ColumnCache(), parent=self)
+        self.store_saver = LastKnownSaver()
+        QApplication.instance().aboutToQuit.connect(self.store_saver.flush)
+        self.store.derive("agents", "agents", self.buildAgentFilter)
+        # Every status change is logged whether or not the history page is open
+        self.history = self.history or StatusHistory()
+        self.store.follow("history", "agents", StatusRecorder(self.history))
+        self.store.follow("sl", "sl", SLAggregator(sl_columns=("SL %",)))
+        self.store.follow("dropped", "dropped", SLAggregator(sl_columns=()))
+        if self.risk_panel is not None:
+            self.followRisk()
+        self.store.updated.connect(self.onSnapshot)
+        self.store.failed.connect(self.onSourceFailed)
+        self.scheduler = RefreshScheduler(self.store, self)
+        self.scheduler.watchWindow(self)
+        self.scheduler.watchStack(self.stack, self.live_pages)
+        # Alerts still need new data while minimized or on another page
+        self.scheduler.setBackgroundInterval(self.scheduler.max_interval)
+        self.feed = install_feed(self.store, self.scheduler)
+        self.sites = install_sites(self.store, self.accounts)
+        self.scheduler.start()
+
+    def followRisk(self):
+        from risk_engine import RiskEngine
+        self.store.follow("risk", ("risky", "sl"), RiskEngine())
 
     def initUI(self):
         self.stack = QStackedWidget()
@@ -44,8 +109,8 @@ class RTMApp(QMainWindow):
         main_layout.insertWidget(1, self.nav_container)
 
         for i in range(1, 5):
-            button = QPushButton(f"Page {i}")
-            button.clicked.connect(lambda _, idx=i: self.stack.setCurrentIndex(idx))
+            button = QPushButton({RISK_PAGE: "Risky Intervals", WALLBOARD_PAGE: "Wallboard", HISTORY_PAGE: "Status History", ALERTS_PAGE: "Alerts"}.get(i, f"Page {i}"))
+            button.clicked.connect(lambda _, idx=i: self.showPage(idx))
             self.nav_layout.addWidget(button)
 
         self.nav_container.setLayout(self.nav_layout)
@@ -56,20 +121,20 @@ class RTMApp(QMainWindow):
         filter_layout = QHBoxLayout()
         self.account_dropdown = QComboBox()
         self.account_dropdown.addItems(self.accounts)
-        self.account_dropdown.currentIndexChanged.connect(self.loadData)
+        self.account_dropdown.currentIndexChanged.connect(self.loadSLData)
         filter_layout.addWidget(QLabel("Account:"))
         filter_layout.addWidget(self.account_dropdown)
 
         self.status_filter = QComboBox()
         self.status_filter.addItem("All")
         self.status_filter.addItems(["Available", "AUX", "Break", "Offline", "Unaligned AUX"])
-        self.status_filter.currentIndexChanged.connect(self.loadData)
+        self.status_filter.currentIndexChanged.connect(self.filter_timer.start)
         filter_layout.addWidget(QLabel("Status:"))
         filter_layout.addWidget(self.status_filter)
 
         self.search_box = QLineEdit()
         self.search_box.setPlaceholderText("Search Agent...")
-        self.search_box.textChanged.connect(self.loadData)
+        self.search_box.textChanged.connect(self.filter_timer.start)
         filter_layout.addWidget(self.search_box)
 
         self.left_layout.addLayout(filter_layout)
@@ -88,12 +153,14 @@ class RTMApp(QMainWindow):
         threshold_layout.addWidget(self.red_threshold)
         
         apply_button = QPushButton("Apply Thresholds")  #Zorar el apply bta3 el alwan
-        apply_button.clicked.connect(self.loadData)
+        apply_button.clicked.connect(self.applyThresholds)
         threshold_layout.addWidget(apply_button)
         
         self.left_layout.addLayout(threshold_layout)
 
-        self.agent_status_table = QTableWidget()
+        self.agent_model = AgentTableModel(self)
+        self.agent_status_table = AgentTableView()
+        self.agent_status_table.setModel(self.agent_model)
         self.left_layout.addWidget(self.agent_status_table)
 
         self.refresh_button = QPushButton("Refresh Now")  #Refresh kol 10 sec 
@@ -123,72 +190,138 @@ class RTMApp(QMainWindow):
 
         self.mainPage.setLayout(main_layout)
         self.stack.addWidget(self.mainPage)
-        
-        for i in range(1, 5):
-            page = QWidget()
-            layout = QVBoxLayout()
-            layout.addWidget(QLabel(f"This is Page {i}"))
-            back_button = QPushButton("Back to Main Page")
-            back_button.clicked.connect(lambda _, idx=0: self.stack.setCurrentIndex(idx))
-            layout.addWidget(back_button)
-            page.setLayout(layout)
+
+    def showPage(self, number):
+        # Pages are built the first time they are opened
+        page = self.pages.get(number)
+        if page is None:
+            page = self.pages[number] = self.buildPage(number)
             self.stack.addWidget(page)
+        self.stack.setCurrentWidget(page)
+
+    def buildPage(self, number):
+        page = QWidget()
+        layout = QVBoxLayout()
+        if number == RISK_PAGE:
+            from risk_engine import RiskPanel
+            self.risk_panel = RiskPanel(self.accounts)
+            layout.addWidget(self.risk_panel)
+            self.live_pages.append(page)
+            if self.store is not None:
+                self.followRisk()
+                self.loadData()
+        elif number == WALLBOARD_PAGE:
+            from wallboard import Wallboard
+            self.wallboard = Wallboard(self.accounts)
+            layout.addWidget(self.wallboard)
+            self.live_pages.append(page)
+            self.wallboard.setThresholds(self.yellow_threshold.value(), self.red_threshold.value())
+            self.updateWallboard()
+            if self.store is not None and self.store.snapshot is not None:
+                self.wallboard.setSites(self.store.snapshot.derived.get("sites"))
+        elif number == HISTORY_PAGE:
+            from status_history import HistoryPanel, StatusHistory
+            self.history = self.history or StatusHistory()
+            self.history_panel = HistoryPanel(self.history, self.accounts)
+            layout.addWidget(self.history_panel)
+            self.live_pages.append(page)
+        elif number == ALERTS_PAGE:
+            from alert_engine import AlertPanel
+            self.alert_panel = AlertPanel(self.alerts)
+            layout.addWidget(self.alert_panel)
+            self.live_pages.append(page)
+        else:
+            layout.addWidget(QLabel(f"This is Page {number}"))
+        back_button = QPushButton("Back to Main Page")
+        back_button.clicked.connect(lambda: self.stack.setCurrentWidget(self.mainPage))
+        layout.addWidget(back_button)
+        page.setLayout(layout)
+        return page
+
+    def showAlerts(self):
+        self.showNormal()
+        self.activateWindow()
+        self.showPage(ALERTS_PAGE)
 
     def toggleNav(self):
         self.nav_visible = not self.nav_visible
         self.nav_container.setVisible(self.nav_visible)
 
     def loadData(self):
+        if self.scheduler is not None:
+            self.scheduler.trigger()
+
+    # Runs on the loader thread whenever agent_status.csv changes
+    def buildAgentFilter(self, df):
+        agent_filter = AgentFilter(df, search_columns=("Login ID",))
+        self.store_saver.offer(agent_filter.store)
+        return agent_filter
+
+    def onSnapshot(self, snapshot):
         try:
-            df = pd.read_csv("agent_status.csv")
-            selected_status = self.status_filter.currentText()
-            search_text = self.search_box.text().strip().lower()
-            
-            if selected_status != "All":
-                df = df[df["Status"] == selected_status]
-            
-            if search_text:
-                df = df[df["Login ID"].astype(str).str.lower().str.contains(search_text)]
-            
-            self.agent_status_table.setRowCount(df.shape[0])
-            self.agent_status_table.setColumnCount(df.shape[1])
-            self.agent_status_table.setHorizontalHeaderLabels(df.columns)
-
-            for row in range(df.shape[0]):
-                for col in range(df.shape[1]):
-                    item = QTableWidgetItem(str(df.iat[row, col]))
-                    if col == 2:
-                        duration = df.iat[row, col]
-                        if duration >= self.red_threshold.value():
-                            item.setBackground(QColor(255, 0, 0))
-                        elif duration >= self.yellow_threshold.value():
-                            item.setBackground(QColor(255, 255, 0))
-                    self.agent_status_table.setItem(row, col, item)
-            
-            self.loadSLData()
+            if "agents" in snapshot.changed:
+                self.agent_filter = snapshot.derived.get("agents")
+                self.applyFilters()
+                if self.agent_filter is not None:
+                    self.alerts.setAgents(self.agent_filter.store)
+            if snapshot.changed & {"sl", "dropped"}:
+                self.loadSLData()
+                self.alerts.setSummaries(snapshot.derived.get("sl"), snapshot.derived.get("dropped"))
+            if "risk" in snapshot.derived and self.risk_panel is not None:
+                self.risk_panel.setSummary(snapshot.derived["risk"])
+            if snapshot.changed & {"agents", "sl", "dropped"}:
+                self.updateWallboard()
+            if "history" in snapshot.derived and self.history_panel is not None:
+                self.history_panel.setRecorded(snapshot.derived["history"])
+            if "sites" in snapshot.derived and self.wallboard is not None:
+                self.wallboard.setSites(snapshot.derived["sites"])
         except Exception as e:
             print(f"Error loading data: {e}")
 
+    def updateWallboard(self):
+        snapshot = self.store.snapshot if self.store is not None else None
+        if self.wallboard is None or snapshot is None or self.agent_filter is None:
+            return
+        self.wallboard.setData(self.agent_filter.store, snapshot.derived.get("sl"), snapshot.derived.get("dropped"))
+
+    def applyThresholds(self):
+        # Recolours from the cached frame; no reload needed
+        self.agent_model.setThresholds("Duration (min)", self.yellow_threshold.value(), self.red_threshold.value())
+        self.alerts.setDurationLimit(self.red_threshold.value())
+        if self.wallboard is not None:
+            self.wallboard.setThresholds(self.yellow_threshold.value(), self.red_threshold.value())
+
+    def applyFilters(self):
+        if self.agent_filter is None:
+            return
+        selected_status = self.status_filter.currentText()
+        search_text = self.search_box.text().strip().lower()
+        self.agent_model.setRows(self.agent_filter.apply(selected_status, search_text))
+
     def loadSLData(self):
         try:
-            sl_df = pd.read_csv("sl_data.csv")
-            dropped_df = pd.read_csv("dropped_intervals.csv")
+            snapshot = self.store.snapshot if self.store is not None else None
+            if snapshot is None:
+                return
             selected_account = self.account_dropdown.currentText()
-            if "Account" in sl_df.columns and "SL %" in sl_df.columns:
-                filtered_sl_df = sl_df[sl_df["Account"] == selected_account]
-                if not filtered_sl_df.empty:
-                    sl_value = filtered_sl_df["SL %"].iloc[-1]
-                    self.sl_label.setText(f"SL %: {sl_value:.2f}")
-                else:
-                    self.sl_label.setText("SL %: No Data Available")
-            if "Account" in dropped_df.columns and "Dropped Intervals" in dropped_df.columns:
-                filtered_dropped_df = dropped_df[dropped_df["Account"] == selected_account]
-                if not filtered_dropped_df.empty:
-                    dropped_value = filtered_dropped_df["Dropped Intervals"].iloc[-1]
-                    self.dropped_intervals_label.setText(f"Dropped Intervals: {dropped_value}")
+            sl_summary = snapshot.derived.get("sl", {}).get(selected_account)
+            if sl_summary is not None and sl_summary.latest_sl is not None:
+                self.sl_label.setText(f"SL %: {sl_summary.latest_sl:.2f}")
+                self.sl_label.setToolTip(rolling_text(sl_summary))
+            elif snapshot.sl is not None and {"Account", "SL %"}.issubset(snapshot.sl.columns):
+                self.sl_label.setText("SL %: No Data Available")
+            dropped_summary = snapshot.derived.get("dropped", {}).get(selected_account)
+            if dropped_summary is not None and dropped_summary.dropped_latest is not None:
+                self.dropped_intervals_label.setText(f"Dropped Intervals: {dropped_summary.dropped_latest}")
         except Exception as e:
             print(f"Error loading SL data: {e}")
 
+    def onSourceFailed(self, name, e):
+        if name in ("sl", "dropped"):
+            print(f"Error loading SL data: {e}")
+        else:
+            print(f"Error loading {name or 'agent'} data: {e}")
+
 if __name__ == "__main__":
     app = QApplication(sys.argv)
     window = RTMApp()
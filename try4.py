@@ -1,11 +1,19 @@
 import sys
-import pandas as pd
 from PyQt5.QtWidgets import (
-    QApplication, QMainWindow, QPushButton, QTableWidget, QTableWidgetItem,
+    QApplication, QMainWindow, QPushButton,
     QVBoxLayout, QWidget, QLabel, QHBoxLayout, QStackedWidget, QComboBox, QLineEdit, QSpinBox
 )
 from PyQt5.QtCore import QTimer
-from PyQt5.QtGui import QFont, QColor
+from PyQt5.QtGui import QFont, QIcon
+from agent_filter import AgentFilter
+from alert_engine import AlertEngine, AlertPanel, AlertTray
+from agent_table import AgentTableModel, AgentTableView
+from column_cache import ColumnCache
+from sl_aggregator import SLAggregator, rolling_text
+from profiler_panel import install_profiler
+from push_feed import install_feed
+from scheduler import RefreshScheduler
+from snapshot import SnapshotStore
 
 class RTMApp(QMainWindow):
     def __init__(self):
@@ -14,14 +22,29 @@ class RTMApp(QMainWindow):
         self.setGeometry(100, 100, 1100, 600)
 
         self.accounts = ["101 Account", "Non Voice Account", "SMB Account", "Smiles Account", "Prestige Account"]
+        self.store = SnapshotStore(cache=ColumnCache(), parent=self)
+        self.store.derive("agents", "agents", self.buildAgentFilter)
+        self.store.follow("sl", "sl", SLAggregator(sl_columns=("SL %",)))
+        self.store.follow("dropped", "dropped", SLAggregator(sl_columns=()))
+        self.store.updated.connect(self.onSnapshot)
+        self.store.failed.connect(self.onSourceFailed)
+        self.agent_filter = None
+        self.alerts = AlertEngine(self)
+        self.filter_timer = QTimer(self)
+        self.filter_timer.setSingleShot(True)
+        self.filter_timer.setInterval(250)
+        self.filter_timer.timeout.connect(self.applyFilters)
         self.initUI()
-        self.loadData()
-        self.loadSLData()
-
-        self.timer = QTimer(self)
-        self.timer.timeout.connect(self.loadData)
-        self.timer.timeout.connect(self.loadSLData)
-        self.timer.start(10000)
+        self.alert_tray = AlertTray(self.alerts, QIcon("menu_icon.png"), on_click=self.showAlerts, parent=self)
+        self.applyThresholds()
+        self.scheduler = RefreshScheduler(self.store, self)
+        self.scheduler.watchWindow(self)
+        self.scheduler.watchStack(self.stack, [self.mainPage, self.alertsPage])
+        # Alerts still need new data while minimized
+        self.scheduler.setBackgroundInterval(self.scheduler.max_interval)
+        self.feed = install_feed(self.store, self.scheduler)
+        self.scheduler.start()
+        self.profiler_overlay = install_profiler(self)
 
     def initUI(self):
         self.stack = QStackedWidget()
@@ -36,7 +59,7 @@ class RTMApp(QMainWindow):
         filter_layout = QHBoxLayout()
         self.account_dropdown = QComboBox()
         self.account_dropdown.addItems(self.accounts)
-        self.account_dropdown.currentIndexChanged.connect(self.loadData)
+        self.account_dropdown.currentIndexChanged.connect(self.filter_timer.start)
         self.account_dropdown.currentIndexChanged.connect(self.loadSLData)
         filter_layout.addWidget(QLabel("Account:"))
         filter_layout.addWidget(self.account_dropdown)
@@ -44,13 +67,13 @@ class RTMApp(QMainWindow):
         self.status_filter = QComboBox()
         self.status_filter.addItem("All")
         self.status_filter.addItems(["Available", "AUX", "Break", "Offline", "Unaligned AUX"])
-        self.status_filter.currentIndexChanged.connect(self.loadData)
+        self.status_filter.currentIndexChanged.connect(self.filter_timer.start)
         filter_layout.addWidget(QLabel("Status:"))
         filter_layout.addWidget(self.status_filter)
 
         self.search_box = QLineEdit()
         self.search_box.setPlaceholderText("Search Agent...")
-        self.search_box.textChanged.connect(self.loadData)
+        self.search_box.textChanged.connect(self.filter_timer.start)
         filter_layout.addWidget(self.search_box)
 
         left_layout.addLayout(filter_layout)
@@ -70,18 +93,24 @@ class RTMApp(QMainWindow):
         threshold_layout.addWidget(self.red_threshold)
         
         apply_button = QPushButton("Apply Thresholds")
-        apply_button.clicked.connect(self.loadData)
+        apply_button.clicked.connect(self.applyThresholds)
         threshold_layout.addWidget(apply_button)
         
         left_layout.addLayout(threshold_layout)
 
-        self.agent_status_table = QTableWidget()
+        self.agent_model = AgentTableModel(self)
+        self.agent_status_table = AgentTableView()
+        self.agent_status_table.setModel(self.agent_model)
         left_layout.addWidget(self.agent_status_table)
 
         self.refresh_button = QPushButton("Refresh Now")
         self.refresh_button.clicked.connect(self.loadData)
         left_layout.addWidget(self.refresh_button)
 
+        alerts_button = QPushButton("Alerts")
+        alerts_button.clicked.connect(self.showAlerts)
+        left_layout.addWidget(alerts_button)
+
         self.sl_label = QLabel("SL %: Loading...")
         self.sl_label.setFont(QFont("Arial", 14, QFont.Bold))
         left_layout.addWidget(self.sl_label)
@@ -96,68 +125,78 @@ class RTMApp(QMainWindow):
         self.mainPage.setLayout(main_layout)
         self.stack.addWidget(self.mainPage)
 
+        self.alertsPage = QWidget()
+        alerts_layout = QVBoxLayout(self.alertsPage)
+        alerts_layout.addWidget(AlertPanel(self.alerts))
+        back_button = QPushButton("Back to Main Page")
+        back_button.clicked.connect(lambda: self.stack.setCurrentWidget(self.mainPage))
+        alerts_layout.addWidget(back_button)
+        self.stack.addWidget(self.alertsPage)
+
+    def showAlerts(self):
+        self.showNormal()
+        self.activateWindow()
+        self.stack.setCurrentWidget(self.alertsPage)
+
     def loadData(self):
-        try:
-            df = pd.read_csv("agent_status.csv")
-            if "Login ID" not in df.columns or "Status" not in df.columns:
-                raise KeyError("Missing required columns in CSV")
+        self.scheduler.trigger()
 
-            selected_account = self.account_dropdown.currentText()
-            selected_status = self.status_filter.currentText()
-            search_text = self.search_box.text().strip().lower()
-
-            if "Account" in df.columns:
-                df = df[df["Account"] == selected_account]
-            if selected_status != "All" and "Status" in df.columns:
-                df = df[df["Status"] == selected_status]
-            if "Login ID" in df.columns:
-                df = df[df["Login ID"].astype(str).str.lower().str.contains(search_text, na=False)]
-
-            self.agent_status_table.setRowCount(df.shape[0])
-            self.agent_status_table.setColumnCount(df.shape[1])
-            self.agent_status_table.setHorizontalHeaderLabels(df.columns)
-            
-            yellow_threshold = self.yellow_threshold.value()
-            red_threshold = self.red_threshold.value()
-            
-            for row in range(df.shape[0]):
-                for col in range(df.shape[1]):
-                    item = QTableWidgetItem(str(df.iat[row, col]))
-                    self.agent_status_table.setItem(row, col, item)
-                    
-                    if df.columns[col] == "Duration (min)":
-                        try:
-                            value = float(df.iat[row, col])
-                            if value >= red_threshold:
-                                item.setBackground(QColor("red"))
-                            elif value >= yellow_threshold:
-                                item.setBackground(QColor("yellow"))
-                        except ValueError:
-                            pass  # Ignore non-numeric values
+    # Runs on the loader thread whenever agent_status.csv changes
+    def buildAgentFilter(self, df):
+        if "Login ID" not in df.columns or "Status" not in df.columns:
+            raise KeyError("Missing required columns in CSV")
+        return AgentFilter(df, search_columns=("Login ID",))
 
+    def onSnapshot(self, snapshot):
+        try:
+            if "agents" in snapshot.changed:
+                self.agent_filter = snapshot.derived.get("agents")
+                self.applyFilters()
+                if self.agent_filter is not None:
+                    self.alerts.setAgents(self.agent_filter.store)
+            if snapshot.changed & {"sl", "dropped"}:
+                self.loadSLData()
+                self.alerts.setSummaries(snapshot.derived.get("sl"), snapshot.derived.get("dropped"))
         except Exception as e:
             print(f"Error loading data: {e}")
 
+    def applyThresholds(self):
+        # Recolours from the cached frame; no reload needed
+        self.agent_model.setThresholds("Duration (min)", self.yellow_threshold.value(), self.red_threshold.value())
+        self.alerts.setDurationLimit(self.red_threshold.value())
+
+    def applyFilters(self):
+        if self.agent_filter is None:
+            return
+        selected_account = self.account_dropdown.currentText()
+        selected_status = self.status_filter.currentText()
+        search_text = self.search_box.text().strip().lower()
+        self.agent_model.setRows(self.agent_filter.apply(selected_status, search_text, account=selected_account))
+
     def loadSLData(self):
         try:
-            sl_df = pd.read_csv("sl_data.csv")
-            dropped_df = pd.read_csv("dropped_intervals.csv")
+            snapshot = self.store.snapshot
+            if snapshot is None:
+                return
             selected_account = self.account_dropdown.currentText()
-            if "Account" in sl_df.columns and "SL %" in sl_df.columns:
-                filtered_sl_df = sl_df[sl_df["Account"] == selected_account]
-                if not filtered_sl_df.empty:
-                    sl_value = filtered_sl_df["SL %"].iloc[-1]
-                    self.sl_label.setText(f"SL %: {sl_value:.2f}")
-                else:
-                    self.sl_label.setText("SL %: No Data Available")
-            if "Account" in dropped_df.columns and "Dropped Intervals" in dropped_df.columns:
-                filtered_dropped_df = dropped_df[dropped_df["Account"] == selected_account]
-                if not filtered_dropped_df.empty:
-                    dropped_value = filtered_dropped_df["Dropped Intervals"].iloc[-1]
-                    self.dropped_intervals_label.setText(f"Dropped Intervals: {dropped_value}")
+            sl_summary = snapshot.derived.get("sl", {}).get(selected_account)
+            if sl_summary is not None and sl_summary.latest_sl is not None:
+                self.sl_label.setText(f"SL %: {sl_summary.latest_sl:.2f}")
+                self.sl_label.setToolTip(rolling_text(sl_summary))
+            elif snapshot.sl is not None and {"Account", "SL %"}.issubset(snapshot.sl.columns):
+                self.sl_label.setText("SL %: No Data Available")
+            dropped_summary = snapshot.derived.get("dropped", {}).get(selected_account)
+            if dropped_summary is not None and dropped_summary.dropped_latest is not None:
+                self.dropped_intervals_label.setText(f"Dropped Intervals: {dropped_summary.dropped_latest}")
         except Exception as e:
             print(f"Error loading SL data: {e}")
 
+    def onSourceFailed(self, name, e):
+        if name in ("sl", "dropped"):
+            print(f"Error loading SL data: {e}")
+        else:
+            print(f"Error loading {name or 'agent'} data: {e}")
+
 if __name__ == "__main__":
     app = QApplication(sys.argv)
     window = RTMApp()
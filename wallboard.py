@@ -0,0 +1,176 @@
+import time
+from collections import namedtuple
+import numpy as np
+from PyQt5.QtCore import QTimer
+from PyQt5.QtGui import QFont
+from PyQt5.QtWidgets import QFrame, QGridLayout, QLabel, QVBoxLayout, QWidget
+
+# agents, statuses and the threshold counts are None when the agent data
+# can't be split by account (not loaded yet, or no Account column)
+AccountSummary = namedtuple("AccountSummary", ["agents", "statuses", "over_yellow", "over_red", "sl", "dropped"])
+
+TILE_COLUMNS = 3
+
+
+def account_summaries(store, accounts, sl=None, dropped=None, yellow=None, red=None, now=None):
+    # Every account in one pass over the agent arrays: category codes are
+    # combined into one (account, status) key and counted with bincount,
+    # which is the whole groupby without building per-account frames
+    n = len(accounts)
+    statuses = []
+    counts = np.zeros((n, 0), dtype=np.int64)
+    agents = np.zeros(n, dtype=np.int64)
+    over_yellow = np.zeros(n, dtype=np.int64)
+    over_red = np.zeros(n, dtype=np.int64)
+    coded = store.codes("Account") if store is not None else None
+    if coded is not None:
+        codes, labels = coded
+        position = {account: i for i, account in enumerate(accounts)}
+        lookup = np.array([position.get(label, -1) for label in labels], dtype=np.int64)
+        account = lookup[codes]
+        mine = account >= 0
+        account = account[mine]
+        agents = np.bincount(account, minlength=n)
+
+        status = store.codes("Status")
+        if status is not None:
+            status_codes, statuses = status
+            width = len(statuses)
+            keys = account * width + status_codes[mine]
+            counts = np.bincount(keys, minlength=n * width).reshape(n, width)
+
+        if store.since is not None and yellow is not None:
+            minutes = ((time.monotonic() if now is None else now) - store.since[mine]) / 60
+            over_red = np.bincount(account, weights=minutes >= red, minlength=n).astype(np.int64)
+            over_yellow = np.bincount(account, weights=minutes >= yellow, minlength=n).astype(np.int64) - over_red
+
+    summaries = {}
+    for i, name in enumerate(accounts):
+        if coded is None:
+            summaries[name] = AccountSummary(None, None, None, None, (sl or {}).get(name), (dropped or {}).get(name))
+            continue
+        by_status = {str(s): int(c) for s, c in zip(statuses, counts[i]) if c and s}
+        summaries[name] = AccountSummary(int(agents[i]), by_status, int(over_yellow[i]), int(over_red[i]),
+                                         (sl or {}).get(name), (dropped or {}).get(name))
+    return summaries
+
+
+def site_summaries(totals, accounts, sl=None, dropped=None, yellow=None, red=None, now=None):
+    # Same tiles from a SiteTotals: every site's agents are already counted
+    # per account, and since is sorted within each account so the agents
+    # over a threshold are found by binary search
+    now = time.time() if now is None else now
+    summaries = {}
+    for i, name in enumerate(accounts):
+        over_yellow = over_red = 0
+        if yellow is not None:
+            since = totals.since[totals.bounds[i]:totals.bounds[i + 1]]
+            over_red = int(np.searchsorted(since, now - red * 60, side="right"))
+            over_yellow = int(np.searchsorted(since, now - yellow * 60, side="right")) - over_red
+        by_status = {s: int(c) for s, c in zip(totals.statuses, totals.counts[i]) if c and s}
+        summaries[name] = AccountSummary(int(totals.agents[i]), by_status, over_yellow, over_red,
+                                         (sl or {}).get(name), (dropped or {}).get(name))
+    return summaries
+
+
+class _Tile(QFrame):
+    def __init__(self, account, parent=None):
+        super().__init__(parent)
+        self.setFrameShape(QFrame.StyledPanel)
+        layout = QVBoxLayout(self)
+        title = QLabel(account)
+        title.setFont(QFont("Arial", 16, QFont.Bold))
+        layout.addWidget(title)
+        self.labels = {}
+        for key in ("sl", "dropped", "agents", "statuses", "thresholds"):
+            label = QLabel()
+            label.setWordWrap(True)
+            if key == "sl":
+                label.setFont(QFont("Arial", 22, QFont.Bold))
+            layout.addWidget(label)
+            self.labels[key] = label
+        layout.addStretch()
+
+    def setText(self, key, text):
+        label = self.labels[key]
+        if label.text() != text:
+            label.setText(text)
+
+
+class Wallboard(QWidget):
+    # All accounts side by side from the shared snapshot; nothing is
+    # computed while the page is hidden
+    def __init__(self, accounts, parent=None):
+        super().__init__(parent)
+        self.accounts = list(accounts)
+        self._store = None
+        self._sites = None
+        self._sl = None
+        self._dropped = None
+        self._yellow = None
+        self._red = None
+        layout = QGridLayout(self)
+        self.tiles = {}
+        for i, account in enumerate(self.accounts):
+            tile = _Tile(account, self)
+            layout.addWidget(tile, i // TILE_COLUMNS, i % TILE_COLUMNS)
+            self.tiles[account] = tile
+        # Agents cross thresholds as time passes, not only on new data
+        self._timer = QTimer(self)
+        self._timer.setInterval(60000)
+        self._timer.timeout.connect(self.updateTiles)
+
+    def setData(self, store, sl=None, dropped=None):
+        self._store = store
+        self._sl = sl
+        self._dropped = dropped
+        self.updateTiles()
+
+    def setSites(self, totals):
+        # Multi-site totals replace the local agent table once they arrive
+        if totals is self._sites:
+            return
+        self._sites = totals
+        self.updateTiles()
+
+    def setThresholds(self, yellow, red):
+        self._yellow = yellow
+        self._red = red
+        self.updateTiles()
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self._timer.start()
+        self.updateTiles()
+
+    def hideEvent(self, event):
+        super().hideEvent(event)
+        self._timer.stop()
+
+    def updateTiles(self):
+        if not self.isVisible():
+            return
+        if self._sites is not None:
+            summaries = site_summaries(self._sites, self.accounts, self._sl, self._dropped, self._yellow, self._red)
+        else:
+            summaries = account_summaries(self._store, self.accounts, self._sl, self._dropped, self._yellow, self._red)
+        for account, summary in summaries.items():
+            tile = self.tiles[account]
+            sl = summary.sl
+            tile.setText("sl", f"SL {sl.latest_sl:.1f}%" if sl is not None and sl.latest_sl is not None else "SL --")
+            dropped = summary.dropped
+            if dropped is not None and dropped.dropped_latest is not None:
+                tile.setText("dropped", f"Dropped: {dropped.dropped_latest} (total {dropped.dropped_total})")
+            else:
+                tile.setText("dropped", "Dropped: --")
+            if summary.agents is None:
+                # Not zeros: the export just doesn't say which account an agent is on
+                unknown = "Agents: --" if self._store is None else "Agents: per-account data unavailable (no Account column)"
+                tile.setText("agents", unknown)
+                tile.setText("statuses", "")
+                tile.setText("thresholds", "")
+                continue
+            tile.setText("agents", f"Agents: {summary.agents}")
+            tile.setText("statuses", ", ".join(f"{s}: {c}" for s, c in sorted(summary.statuses.items())))
+            if self._yellow is not None:
+                tile.setText("thresholds", f"Yellow ({self._yellow}+ min): {summary.over_yellow}   Red ({self._red}+ min): {summary.over_red}")